@@ -0,0 +1,42 @@
+"""create appointments
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'appointments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=False),
+        sa.Column('timezone', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_appointments_id'), 'appointments', ['id'], unique=False)
+    op.create_index(op.f('ix_appointments_user_id'), 'appointments', ['user_id'], unique=False)
+    op.create_index(op.f('ix_appointments_start_time'), 'appointments', ['start_time'], unique=False)
+    op.create_index(op.f('ix_appointments_end_time'), 'appointments', ['end_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_appointments_end_time'), table_name='appointments')
+    op.drop_index(op.f('ix_appointments_start_time'), table_name='appointments')
+    op.drop_index(op.f('ix_appointments_user_id'), table_name='appointments')
+    op.drop_index(op.f('ix_appointments_id'), table_name='appointments')
+    op.drop_table('appointments')
@@ -0,0 +1,38 @@
+"""appointments archive
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'appointments_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=False),
+        sa.Column('timezone', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_appointments_archive_user_id'), 'appointments_archive', ['user_id'], unique=False)
+    op.create_index(op.f('ix_appointments_archive_start_time'), 'appointments_archive', ['start_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_appointments_archive_start_time'), table_name='appointments_archive')
+    op.drop_index(op.f('ix_appointments_archive_user_id'), table_name='appointments_archive')
+    op.drop_table('appointments_archive')
@@ -0,0 +1,44 @@
+"""timezone aware datetimes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('appointments', 'appointments_archive')
+COLUMNS = ('start_time', 'end_time')
+
+
+def upgrade() -> None:
+    # Existing values were written as UTC
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            for column in COLUMNS:
+                batch_op.alter_column(column,
+                                      existing_type=sa.DateTime(),
+                                      type_=sa.DateTime(timezone=True),
+                                      existing_nullable=False,
+                                      postgresql_using=f"{column} AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            for column in COLUMNS:
+                batch_op.alter_column(column,
+                                      existing_type=sa.DateTime(timezone=True),
+                                      type_=sa.DateTime(),
+                                      existing_nullable=False,
+                                      postgresql_using=f"{column} AT TIME ZONE 'UTC'")
@@ -0,0 +1,29 @@
+"""user and start time index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The composite index also serves every lookup the single-column one did
+    op.create_index('ix_appointments_user_id_start_time', 'appointments', ['user_id', 'start_time'], unique=False)
+    op.drop_index('ix_appointments_user_id', table_name='appointments')
+
+
+def downgrade() -> None:
+    op.create_index('ix_appointments_user_id', 'appointments', ['user_id'], unique=False)
+    op.drop_index('ix_appointments_user_id_start_time', table_name='appointments')
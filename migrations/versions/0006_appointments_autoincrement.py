@@ -0,0 +1,42 @@
+"""appointments autoincrement on sqlite
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres sequences never reuse ids; only SQLite needs the table rebuilt with AUTOINCREMENT
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('appointments', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+    # Start after every id handed out so far, including ids that now only exist in the archive
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'appointments'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'appointments', "
+        "MAX(COALESCE((SELECT MAX(id) FROM appointments), 0), "
+        "COALESCE((SELECT MAX(id) FROM appointments_archive), 0))"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('appointments', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
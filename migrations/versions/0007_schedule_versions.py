@@ -0,0 +1,32 @@
+"""schedule versions
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-21 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'schedule_versions',
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('next_expiry', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('location')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('schedule_versions')
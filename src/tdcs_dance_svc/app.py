@@ -1,11 +1,53 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from tdcs_dance_svc.config import GZIP_MINIMUM_SIZE, HOLD_SWEEP_SECONDS
+from tdcs_dance_svc.holds import run_hold_sweeper
+from tdcs_dance_svc.loadshed import LoadSheddingMiddleware, concurrency_limiter
+from tdcs_dance_svc.models.base import dispose_engines, get_engine
+from tdcs_dance_svc.profiling import QueryProfilerMiddleware, query_profiler
+from tdcs_dance_svc.ratelimit import RateLimitMiddleware, rate_limiter
 from tdcs_dance_svc.routers.appointment import router as appointment_router
-from tdcs_dance_svc.routers import google_auth
+from tdcs_dance_svc.routers import google_auth, health, metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The engine is created here or on first use, never at import time
+    get_engine()
+    sweeper = asyncio.create_task(run_hold_sweeper()) if HOLD_SWEEP_SECONDS > 0 else None
+    yield
+    if sweeper is not None:
+        sweeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper
+    dispose_engines()
+
+
+app = FastAPI(debug=True, lifespan=lifespan)
 
-app = FastAPI(debug=True)
+# Adaptive concurrency limit and request deadlines for database-bound routes
+app.add_middleware(LoadSheddingMiddleware, limiter=concurrency_limiter)
+
+# Admission control for booking and OAuth routes
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+# Per-request SQL statistics in debug headers; a pass-through unless SQL_PROFILING is set
+app.add_middleware(QueryProfilerMiddleware, profiler=query_profiler)
+
+# Compress large JSON responses; Starlette leaves event streams and already-encoded exports alone
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
 
 # Include appointment booking router
 app.include_router(appointment_router, prefix="/appointments")
 
 # Include Google OAuth router
 app.include_router(google_auth.router, prefix="/auth/google")
+
+# Include metrics router
+app.include_router(metrics.router)
+
+# Include health router
+app.include_router(health.router)
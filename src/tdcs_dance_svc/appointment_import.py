@@ -0,0 +1,243 @@
+import codecs
+import csv
+import logging
+import tempfile
+from bisect import bisect_left
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, select, union_all
+from sqlalchemy.orm import Session
+
+from tdcs_dance_svc.caching import bump_schedule_version
+from tdcs_dance_svc.config import IMPORT_BATCH_SIZE, IMPORT_MAX_BYTES
+from tdcs_dance_svc.email_reminder import schedule_email_reminder
+from tdcs_dance_svc.events import APPOINTMENT_CREATED, broker
+from tdcs_dance_svc.models.appointment import Appointment, AppointmentHold
+from tdcs_dance_svc.models.base import session_location
+from tdcs_dance_svc.notification import notify_instructor
+
+IMPORT_FIELDS = ("user_id", "start_time", "end_time", "timezone")
+
+STATUS_IMPORTED = "imported"
+STATUS_INVALID = "invalid"
+STATUS_CONFLICT = "conflict"
+
+# Read size when replaying a spooled upload
+SPOOL_CHUNK_BYTES = 64 * 1024
+
+
+class ImportTooLarge(ValueError):
+    """The CSV upload is larger than the import size limit."""
+
+
+def spool_upload(chunks: Iterable[bytes], max_bytes: int = IMPORT_MAX_BYTES) -> BinaryIO:
+    """Copy an upload to a temporary file and rewind it.
+
+    Raises ``ImportTooLarge`` once more than ``max_bytes`` have been read, before any row is
+    imported. The caller closes the returned file, which deletes it.
+    """
+    spool = tempfile.TemporaryFile()
+    received = 0
+    try:
+        for chunk in chunks:
+            received += len(chunk)
+            if received > max_bytes:
+                raise ImportTooLarge(f"CSV is larger than {max_bytes} bytes")
+            spool.write(chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+def iter_spooled(spool: BinaryIO) -> Iterator[bytes]:
+    while chunk := spool.read(SPOOL_CHUNK_BYTES):
+        yield chunk
+
+
+def iter_csv_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode UTF-8 (with or without BOM) byte chunks into lines as they arrive.
+
+    Only the current chunk and an unfinished line are held in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).splitlines(keepends=True)
+        # Hold back an unfinished line, including a lone "\r" that may be half of "\r\n"
+        pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        yield from lines
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _result(row: int, status: str, appointment_id: Optional[int] = None, error: Optional[str] = None) -> dict:
+    return {"row": row, "status": status, "appointment_id": appointment_id, "error": error}
+
+
+@lru_cache(maxsize=None)
+def _lookup_zone(name: str) -> Optional[ZoneInfo]:
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return None
+
+
+def _validate_batch(batch: list[tuple[int, dict]]) -> tuple[list[dict], list[dict]]:
+    """Parse and validate a batch of CSV rows.
+
+    Each distinct timezone in the batch is resolved once. Naive timestamps are read as local
+    time in the row's timezone. Returns (valid candidates, rejection results).
+    """
+    zones = {}
+    for _, record in batch:
+        name = (record.get("timezone") or "").strip()
+        if name not in zones:
+            zones[name] = _lookup_zone(name) if name else None
+
+    candidates, rejected = [], []
+    for row_number, record in batch:
+        zone_name = (record.get("timezone") or "").strip()
+        zone = zones[zone_name]
+        try:
+            user_id = int(record.get("user_id") or "")
+            start = datetime.fromisoformat((record.get("start_time") or "").strip())
+            end = datetime.fromisoformat((record.get("end_time") or "").strip())
+        except ValueError as e:
+            rejected.append(_result(row_number, STATUS_INVALID, error=str(e)))
+            continue
+        if zone is None:
+            rejected.append(_result(row_number, STATUS_INVALID, error="Invalid timezone provided"))
+            continue
+        start = (start if start.tzinfo else start.replace(tzinfo=zone)).astimezone(timezone.utc)
+        end = (end if end.tzinfo else end.replace(tzinfo=zone)).astimezone(timezone.utc)
+        if end <= start:
+            rejected.append(_result(row_number, STATUS_INVALID, error="End time must be after start time"))
+            continue
+        candidates.append({"row": row_number, "user_id": user_id, "start_time": start,
+                           "end_time": end, "timezone": zone_name,
+                           "locale": (record.get("locale") or "").strip() or None})
+    return candidates, rejected
+
+
+def _sweep_conflicts(db: Session, candidates: list[dict]) -> tuple[list[dict], list[dict]]:
+    """Reject candidates that overlap an existing appointment, an active hold or an earlier row.
+
+    Existing appointments and unexpired holds in the batch's time span are loaded with one
+    query, sorted by start, and searched with a prefix maximum of end times. The surviving candidates are then swept in
+    start order; since accepted intervals never overlap, only the last accepted end matters.
+    """
+    if not candidates:
+        return [], []
+    span_start = min(c["start_time"] for c in candidates)
+    span_end = max(c["end_time"] for c in candidates)
+    now = datetime.now(timezone.utc)
+    taken = union_all(
+        select(Appointment.start_time, Appointment.end_time)
+        .where(Appointment.start_time < span_end, Appointment.end_time > span_start),
+        select(AppointmentHold.start_time, AppointmentHold.end_time)
+        .where(AppointmentHold.start_time < span_end, AppointmentHold.end_time > span_start,
+               AppointmentHold.expires_at > now)
+    )
+    existing = db.execute(taken.order_by(taken.selected_columns.start_time)).all()
+    existing_starts = [row.start_time for row in existing]
+    max_end_prefix = []
+    for row in existing:
+        end = row.end_time
+        max_end_prefix.append(max(end, max_end_prefix[-1]) if max_end_prefix else end)
+
+    accepted, rejected = [], []
+    last_accepted = None
+    for candidate in sorted(candidates, key=lambda c: (c["start_time"], c["row"])):
+        earlier = bisect_left(existing_starts, candidate["end_time"])
+        if earlier and max_end_prefix[earlier - 1] > candidate["start_time"]:
+            rejected.append(_result(candidate["row"], STATUS_CONFLICT,
+                                    error="Time slot conflict with an existing appointment"))
+        elif last_accepted is not None and candidate["start_time"] < last_accepted["end_time"]:
+            rejected.append(_result(candidate["row"], STATUS_CONFLICT,
+                                    error=f"Time slot conflict with row {last_accepted['row']}"))
+        else:
+            accepted.append(candidate)
+            last_accepted = candidate
+    return accepted, rejected
+
+
+def _batches(records: Iterator[dict], batch_size: int) -> Iterator[list[tuple[int, dict]]]:
+    # Row numbers are 1-based data rows, not counting the header
+    numbered = enumerate(records, start=1)
+    while True:
+        batch = list(islice(numbered, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _run_side_effects(appointment: Appointment, locale: Optional[str] = None) -> None:
+    try:
+        schedule_email_reminder(appointment, locale)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+    try:
+        notify_instructor(appointment)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+
+
+def import_appointments(db: Session, lines: Iterable[str], notify: bool = False,
+                        batch_size: int = IMPORT_BATCH_SIZE) -> list[dict]:
+    """Import appointments from CSV text with the columns user_id, start_time, end_time, timezone,
+    and optionally locale, the language of the row's reminder email.
+
+    The CSV is consumed in batches: each batch is validated, checked for conflicts, bulk inserted
+    and committed before the next one is read, so later batches also see earlier ones as existing
+    appointments. Historical (past) appointments are accepted. Reminders and instructor
+    notifications only run when ``notify`` is set. Returns one result per data row, in row order.
+    """
+    reader = csv.DictReader(lines)
+    missing = [field for field in IMPORT_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+
+    results = []
+    for batch in _batches(iter(reader), batch_size):
+        candidates, rejected = _validate_batch(batch)
+        results.extend(rejected)
+        if not candidates:
+            continue
+
+        try:
+            # Lock the location's schedule before the conflict check, as single bookings do
+            bump_schedule_version(db)
+            accepted, conflicts = _sweep_conflicts(db, candidates)
+            results.extend(conflicts)
+            if not accepted:
+                db.rollback()
+                continue
+            rows = [{key: c[key] for key in IMPORT_FIELDS} for c in accepted]
+            ids = db.scalars(
+                insert(Appointment).returning(Appointment.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for candidate, appointment_id in zip(accepted, ids):
+            results.append(_result(candidate["row"], STATUS_IMPORTED, appointment_id=appointment_id))
+            appointment = Appointment(id=appointment_id, **{key: candidate[key] for key in IMPORT_FIELDS})
+            try:
+                broker.publish(APPOINTMENT_CREATED, appointment, session_location(db))
+            except Exception as e:
+                logging.error(e, exc_info=True)
+            if notify:
+                _run_side_effects(appointment, candidate["locale"])
+
+    results.sort(key=lambda r: r["row"])
+    return results
@@ -0,0 +1,52 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from tdcs_dance_svc.caching import bump_schedule_version
+from tdcs_dance_svc.config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+from tdcs_dance_svc.models.appointment import Appointment, ArchivedAppointment
+
+ARCHIVE_COLUMNS = ("id", "user_id", "start_time", "end_time", "timezone")
+
+
+def archive_cutoff(now: Optional[datetime] = None, days: int = ARCHIVE_AFTER_DAYS) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(days=days)
+
+
+def archive_past_appointments(db: Session, before: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move appointments that ended before ``before`` into ``appointments_archive``.
+
+    Each batch is copied and deleted in its own transaction so the hot table is never locked
+    for long, and an interrupted run can simply be started again. Returns the number of rows moved.
+    """
+    moved = 0
+    while True:
+        ids = db.scalars(
+            select(Appointment.id)
+            .where(Appointment.end_time < before)
+            .order_by(Appointment.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        try:
+            live_columns = [getattr(Appointment, name) for name in ARCHIVE_COLUMNS]
+            db.execute(
+                insert(ArchivedAppointment).from_select(
+                    list(ARCHIVE_COLUMNS),
+                    select(*live_columns).where(Appointment.id.in_(ids))
+                )
+            )
+            db.execute(delete(Appointment).where(Appointment.id.in_(ids)))
+            bump_schedule_version(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        moved += len(ids)
+        logging.info(f"Archived {len(ids)} appointments (total {moved})")
+    return moved
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import case, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from tdcs_dance_svc.models.appointment import AppointmentHold, ScheduleVersion
+from tdcs_dance_svc.models.base import get_read_db, get_shard_db, session_location
+
+
+def _upsert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def bump_schedule_version(db: Session, hold_expires_at: Optional[datetime] = None) -> None:
+    """Count a write to the schedule ``db`` is bound to, in the caller's transaction.
+
+    The upsert locks the location's version row until the transaction ends, so writers that
+    call this before their conflict check are serialized per location, and under READ
+    COMMITTED the check then sees what the previous writer committed. A new hold passes its
+    ``expires_at``, which bumps the version again when the hold expires.
+    """
+    location = session_location(db)
+    next_expiry = ScheduleVersion.next_expiry
+    if hold_expires_at is None:
+        new_expiry = next_expiry
+    else:
+        new_expiry = case((or_(next_expiry.is_(None), next_expiry > hold_expires_at), hold_expires_at),
+                          else_=next_expiry)
+    changes = {"version": ScheduleVersion.version + 1, "next_expiry": new_expiry}
+
+    dialect_insert = _upsert(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(ScheduleVersion).values(location=location, version=1, next_expiry=hold_expires_at)
+        db.execute(statement.on_conflict_do_update(index_elements=[ScheduleVersion.location], set_=changes))
+        return
+    result = db.execute(update(ScheduleVersion).where(ScheduleVersion.location == location).values(changes))
+    if not result.rowcount:
+        db.execute(insert(ScheduleVersion).values(location=location, version=1, next_expiry=hold_expires_at))
+
+
+def _advance_past_expired_holds(db: Session, location: str, now: datetime) -> None:
+    # Only one worker's update matches; the others see the advanced row afterwards
+    db.execute(
+        update(ScheduleVersion)
+        .where(ScheduleVersion.location == location, ScheduleVersion.next_expiry <= now)
+        .values(
+            version=ScheduleVersion.version + 1,
+            next_expiry=select(func.min(AppointmentHold.expires_at))
+            .where(AppointmentHold.expires_at > now)
+            .scalar_subquery()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def schedule_version(db: Session, primary: Session, now: Optional[datetime] = None) -> int:
+    """The schedule's version, read with one primary key lookup on ``db``.
+
+    When a hold expired since the last write, the version is advanced on ``primary`` first.
+    """
+    now = now or datetime.now(timezone.utc)
+    location = session_location(primary)
+    lookup = (
+        select(ScheduleVersion.version, (ScheduleVersion.next_expiry <= now).label("expired"))
+        .where(ScheduleVersion.location == location)
+    )
+    row = db.execute(lookup).first()
+    if row is None:
+        return 0
+    if not row.expired:
+        return row.version
+    _advance_past_expired_holds(primary, location, now)
+    return primary.execute(lookup).first().version
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses the weak comparison, so a W/ prefix does not matter
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+def schedule_etag(request: Request, response: Response, db: Session = Depends(get_read_db),
+                  primary: Session = Depends(get_shard_db)) -> str:
+    """Route dependency for schedule reads.
+
+    Answers ``304 Not Modified`` when the client's ``If-None-Match`` still matches, after one
+    version lookup and before the route's own query runs. Otherwise sets the ``ETag``, which
+    is weak because the same representation may be sent gzipped or plain.
+    """
+    etag = f'W/"{session_location(primary)}-{schedule_version(db, primary)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return etag
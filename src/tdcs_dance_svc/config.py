@@ -1,8 +1,54 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# Only load python-dotenv when there is an env file to read
+ENV_FILE = os.getenv("ENV_FILE", ".env")
+if os.path.isfile(ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///:memory:")
 SERVICE_HOST = os.getenv("SERVICE_HOST", "0.0.0.0")
-SERVICE_PORT = os.getenv("SERVICE_PORT", 8000)
\ No newline at end of file
+SERVICE_PORT = os.getenv("SERVICE_PORT", 8000)
+EVENT_STREAM_QUEUE_SIZE = int(os.getenv("EVENT_STREAM_QUEUE_SIZE", 100))
+EVENT_STREAM_HEARTBEAT_SECONDS = float(os.getenv("EVENT_STREAM_HEARTBEAT_SECONDS", 15))
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DATABASE_STICKY_SECONDS = float(os.getenv("DATABASE_STICKY_SECONDS", 5))
+DATABASE_REPLICA_RETRY_SECONDS = float(os.getenv("DATABASE_REPLICA_RETRY_SECONDS", 30))
+# Comma separated location=url pairs, e.g. "downtown=postgresql://db1/dance,uptown=postgresql://db2/dance"
+DATABASE_SHARDS = dict(
+    (location.strip(), url.strip())
+    for location, _, url in (entry.partition("=") for entry in os.getenv("DATABASE_SHARDS", "").split(","))
+    if location.strip() and url.strip()
+)
+SHARD_QUERY_WORKERS = int(os.getenv("SHARD_QUERY_WORKERS", 8))
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 7))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 1000))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+RATE_LIMITS = os.getenv("RATE_LIMITS", "POST /appointments/book=30/60;GET /auth/google/callback=10/60")
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", 16))
+SQL_PROFILING = os.getenv("SQL_PROFILING", "False").lower() in ("true", "1", "yes")
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 100))
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", 5))
+DEFAULT_LOCALE = os.getenv("DEFAULT_LOCALE", "en")
+TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", os.path.join(os.path.dirname(__file__), "templates"))
+TEMPLATE_RELOAD_SECONDS = float(os.getenv("TEMPLATE_RELOAD_SECONDS", 5))
+HOLD_TTL_SECONDS = int(os.getenv("HOLD_TTL_SECONDS", 600))
+HOLD_MAX_TTL_SECONDS = int(os.getenv("HOLD_MAX_TTL_SECONDS", 1800))
+HOLD_SWEEP_SECONDS = float(os.getenv("HOLD_SWEEP_SECONDS", 30))
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", 1000))
+CONCURRENCY_INITIAL_LIMIT = int(os.getenv("CONCURRENCY_INITIAL_LIMIT", 20))
+CONCURRENCY_MIN_LIMIT = int(os.getenv("CONCURRENCY_MIN_LIMIT", 2))
+# Starlette runs sync routes on a 40-thread pool; admitting more only queues them
+CONCURRENCY_MAX_LIMIT = int(os.getenv("CONCURRENCY_MAX_LIMIT", 40))
+CONCURRENCY_LATENCY_TARGET_MS = float(os.getenv("CONCURRENCY_LATENCY_TARGET_MS", 250))
+OVERLOAD_WINDOW_SECONDS = float(os.getenv("OVERLOAD_WINDOW_SECONDS", 5))
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", 5))
+LOAD_SHED_PATHS = tuple(path.strip() for path in os.getenv("LOAD_SHED_PATHS", "/appointments").split(",") if path.strip())
+ALEMBIC_CONFIG = os.getenv("ALEMBIC_CONFIG", "alembic.ini")
+READINESS_TIMEOUT_SECONDS = float(os.getenv("READINESS_TIMEOUT_SECONDS", 2))
+DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "False").lower() in ("true", "1", "yes")
+# When set, /debug endpoints also serve non-local callers that send it as X-Debug-Token
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", 10))
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", 50 * 1024 * 1024))
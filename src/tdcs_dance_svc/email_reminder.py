@@ -1,17 +1,20 @@
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Optional, Union
 
+from tdcs_dance_svc.templating import RenderedEmail, render_reminder
 
-def schedule_email_reminder(appointment: Any) -> None:
+
+def schedule_email_reminder(appointment: Any, locale: Optional[str] = None) -> None:
     """
     Schedule an email reminder for an appointment.
 
     This function validates the appointment object for required fields, computes the reminder time
-    (30 minutes before the appointment's start time), prepares the email content using a predefined 
-    template, and integrates with the email scheduling service. It retries up to 2 additional times 
-    (total 3 attempts) if the scheduling service fails.
+    (30 minutes before the appointment's start time), renders the text and HTML email from the
+    cached reminder templates in the appointment's timezone and the recipient's ``locale``, and
+    integrates with the email scheduling service. It retries up to 2 additional times (total 3
+    attempts) if the scheduling service fails.
     """
     try:
         # Validate appointment object has required attributes and non-None values
@@ -27,9 +30,8 @@ def schedule_email_reminder(appointment: Any) -> None:
         # Compute reminder time (30 minutes before the start_time)
         reminder_time = appointment.start_time - timedelta(minutes=30)
 
-        # Prepare email content using a predefined template
-        email_content = (f"Reminder: Your appointment (ID: {appointment.id}) is scheduled at "
-                         f"{appointment.start_time}. Please be prepared.")
+        # Render email content in the appointment's timezone and the recipient's language
+        email_content = render_reminder(appointment, locale)
 
         # Retry mechanism parameters
         max_retries = 2
@@ -55,7 +57,7 @@ def schedule_email_reminder(appointment: Any) -> None:
         logging.error(e, exc_info=True)
 
 
-def schedule_email(content: str, scheduled_time: datetime) -> bool:
+def schedule_email(content: Union[RenderedEmail, str], scheduled_time: datetime) -> bool:
     """
     Simulated email scheduling service integration.
 
@@ -64,7 +66,8 @@ def schedule_email(content: str, scheduled_time: datetime) -> bool:
     success.
     """
     try:
-        logging.info(f"Simulated scheduling of email with content: '{content}' at {scheduled_time}")
+        text = content.text if isinstance(content, RenderedEmail) else content
+        logging.info(f"Simulated scheduling of email with content: '{text}' at {scheduled_time}")
         return True
     except Exception as e:
         logging.error(e, exc_info=True)
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Optional
+
+from tdcs_dance_svc.config import EVENT_STREAM_QUEUE_SIZE
+from tdcs_dance_svc.models.base import DEFAULT_LOCATION
+
+APPOINTMENT_CREATED = "created"
+APPOINTMENT_CANCELLED = "cancelled"
+APPOINTMENT_RESCHEDULED = "rescheduled"
+
+
+class Subscription:
+    """A single consumer of schedule events.
+
+    Events are delivered through a bounded asyncio queue owned by the consumer's event loop.
+    When the consumer falls behind and the queue fills up, pending events are dropped and a
+    ``None`` marker is queued so the stream can tell the client to reconnect and resync.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_size: int,
+                 user_id: Optional[int] = None,
+                 start: Optional[datetime] = None,
+                 end: Optional[datetime] = None,
+                 location: Optional[str] = None):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.user_id = user_id
+        self.location = location
+        self.start = start
+        self.end = end
+        self.overflowed = False
+
+    def matches(self, event: dict) -> bool:
+        if self.user_id is not None and event["user_id"] != self.user_id:
+            return False
+        if self.location is not None and event["location"] != self.location:
+            return False
+        if self.start is not None and event["_end"] <= self.start:
+            return False
+        if self.end is not None and event["_start"] >= self.end:
+            return False
+        return True
+
+    def offer(self, event: dict) -> None:
+        # Runs on the subscriber's event loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventBroker:
+    """In-process fan-out of appointment changes to stream subscribers.
+
+    Publishing is safe from worker threads: each event is handed to the subscriber's loop with
+    ``call_soon_threadsafe``, so a slow consumer never blocks the publisher.
+    """
+
+    def __init__(self, max_queue_size: int = EVENT_STREAM_QUEUE_SIZE):
+        self.max_queue_size = max_queue_size
+        self._subscriptions: set[Subscription] = set()
+        self._lock = Lock()
+
+    def subscribe(self, user_id: Optional[int] = None,
+                  start: Optional[datetime] = None,
+                  end: Optional[datetime] = None,
+                  location: Optional[str] = None) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queue_size,
+                                    user_id=user_id, start=start, end=end, location=location)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+    def queue_depths(self) -> list[int]:
+        """Pending events per subscriber, deepest first."""
+        with self._lock:
+            return sorted((subscription.queue.qsize() for subscription in self._subscriptions), reverse=True)
+
+    def publish(self, event_type: str, appointment: Any, location: str = DEFAULT_LOCATION) -> None:
+        """Fan ``appointment`` out to matching subscribers, tagged with the location it was stored at."""
+        start_time = appointment.start_time.astimezone(timezone.utc)
+        end_time = appointment.end_time.astimezone(timezone.utc)
+        event = {
+            "type": event_type,
+            "appointment_id": appointment.id,
+            "user_id": appointment.user_id,
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+            "timezone": appointment.timezone,
+            "location": location,
+            "_start": start_time,
+            "_end": end_time,
+        }
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.matches(event)]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError as e:
+                # The subscriber's loop is gone; drop it
+                logging.error(e, exc_info=True)
+                self.unsubscribe(subscription)
+
+
+def public_payload(event: dict) -> dict:
+    return {key: value for key, value in event.items() if not key.startswith("_")}
+
+
+broker = EventBroker()
@@ -0,0 +1,98 @@
+import io
+import csv
+import json
+import logging
+import zlib
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterator, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from tdcs_dance_svc.config import EXPORT_BATCH_SIZE
+from tdcs_dance_svc.models.appointment import Appointment, ArchivedAppointment
+
+EXPORT_FIELDS = ("appointment_id", "user_id", "start_time", "end_time", "timezone")
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str):
+    try:
+        return ZoneInfo(name)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        return timezone.utc
+
+
+def iter_export_rows(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[tuple]:
+    """Yield export rows for appointments starting in [start, end), archived ones first.
+
+    Rows are fetched ``batch_size`` at a time through ``yield_per`` so that the result set is
+    never materialized; on Postgres this uses a server-side cursor.
+    """
+    for model in (ArchivedAppointment, Appointment):
+        query = select(model.id, model.user_id, model.start_time, model.end_time, model.timezone)
+        if start is not None:
+            query = query.where(model.start_time >= start.astimezone(timezone.utc))
+        if end is not None:
+            query = query.where(model.start_time < end.astimezone(timezone.utc))
+        query = query.order_by(model.start_time, model.id).execution_options(yield_per=batch_size)
+        for row in db.execute(query):
+            zone = _zone(row.timezone)
+            yield (row.id, row.user_id, row.start_time.astimezone(zone).isoformat(),
+                   row.end_time.astimezone(zone).isoformat(), row.timezone)
+
+
+def _encode_batches(rows: Iterator[tuple], fmt: str, batch_size: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(EXPORT_FIELDS)
+    pending = 0
+    for row in rows:
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(dict(zip(EXPORT_FIELDS, row))))
+            buffer.write("\n")
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(db: Session, fmt: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  compress: bool = False, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encode the export as CSV or NDJSON chunks, optionally gzip-compressed on the fly.
+
+    The session is closed when the stream ends: depending on the FastAPI version the request
+    dependency may already have been torn down before the body is sent.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+    try:
+        for chunk in _encode_batches(iter_export_rows(db, start, end, batch_size), fmt, batch_size):
+            data = chunk.encode("utf-8")
+            if compressor:
+                data = compressor.compress(data)
+                if not data:
+                    continue
+            yield data
+        if compressor:
+            yield compressor.flush()
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated body
+        logging.error(e, exc_info=True)
+        raise
+    finally:
+        db.close()
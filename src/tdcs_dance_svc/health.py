@@ -0,0 +1,209 @@
+import asyncio
+import gc
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from tdcs_dance_svc.config import ALEMBIC_CONFIG, READINESS_TIMEOUT_SECONDS, TRACEMALLOC_FRAMES
+from tdcs_dance_svc.events import broker
+from tdcs_dance_svc.loadshed import concurrency_limiter, statement_deadline
+from tdcs_dance_svc.models.base import DEFAULT_LOCATION, get_engine, get_replica_router, get_shard_map
+
+
+def database_engines() -> dict[str, Engine]:
+    """The engines that hold schedules: one per shard, or the primary when unsharded."""
+    shard_map = get_shard_map()
+    if shard_map is None:
+        return {DEFAULT_LOCATION: get_engine()}
+    return dict(shard_map.engines)
+
+
+# Readiness checks run here rather than on the request threadpool, so a database that
+# hangs ties up at most one of these threads per engine
+_probe_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="readiness")
+_probes: dict[Engine, Future] = {}
+
+
+def _script_directory(config_path: str):
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(config_path)
+    # script_location is relative to the ini file, not the working directory
+    config.set_main_option("script_location", os.path.join(
+        os.path.dirname(os.path.abspath(config_path)), config.get_main_option("script_location")
+    ))
+    return ScriptDirectory.from_config(config)
+
+
+@lru_cache(maxsize=None)
+def migration_heads(config_path: str = ALEMBIC_CONFIG) -> tuple[str, ...]:
+    """Head revisions of the deployed migration scripts; empty when they are not deployed."""
+    if not os.path.isfile(config_path):
+        return ()
+    return tuple(sorted(_script_directory(config_path).get_heads()))
+
+
+@lru_cache(maxsize=None)
+def migration_revisions(config_path: str = ALEMBIC_CONFIG) -> frozenset[str]:
+    """Every revision of the deployed migration scripts; empty when they are not deployed."""
+    if not os.path.isfile(config_path):
+        return frozenset()
+    return frozenset(script.revision for script in _script_directory(config_path).walk_revisions())
+
+
+def check_database(engine: Engine, heads: tuple[str, ...], known: Optional[frozenset[str]] = None,
+                   timeout: Optional[float] = None) -> dict:
+    """Ping the database and, when ``heads`` is known, check that it is not behind them.
+
+    A revision missing from ``known`` comes from newer code, such as during a rollout or
+    rollback, and counts as ahead of ``heads``; without ``known`` the revisions must match
+    ``heads`` exactly. ``timeout`` bounds each statement like a request deadline does.
+    """
+    result = {"ok": False, "latency_ms": None, "revision": None, "ahead": False, "error": None}
+    started = time.perf_counter()
+    try:
+        with statement_deadline(timeout or READINESS_TIMEOUT_SECONDS), engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            if not heads:
+                result["ok"] = True
+                return result
+            revisions = tuple(sorted(connection.execute(text("SELECT version_num FROM alembic_version")).scalars()))
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+    result["revision"] = ",".join(revisions) or None
+    if known is None:
+        ahead = False
+        behind = revisions != heads
+    else:
+        ahead = any(revision not in known for revision in revisions)
+        behind = (not revisions or any(revision in known and revision not in heads for revision in revisions)
+                  or (not ahead and set(revisions) != set(heads)))
+    result["ok"] = not behind
+    result["ahead"] = ahead and not behind
+    if behind:
+        result["error"] = f"Database is at {result['revision']}, migrations head is {','.join(heads)}"
+    return result
+
+
+async def check_databases(timeout: float = READINESS_TIMEOUT_SECONDS) -> dict[str, dict]:
+    """Check every schedule database concurrently, giving each ``timeout`` seconds.
+
+    A check that is still running when the next probe arrives is waited on again instead
+    of being started a second time.
+    """
+    heads = await run_in_threadpool(migration_heads)
+    known = await run_in_threadpool(migration_revisions)
+
+    async def check(engine: Engine) -> dict:
+        probe = _probes.get(engine)
+        if probe is None or probe.done():
+            probe = _probe_executor.submit(check_database, engine, heads, known, timeout)
+            _probes[engine] = probe
+        try:
+            # Shielded so that timing out leaves the probe for the next caller to wait on
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(probe)), timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "latency_ms": None, "revision": None, "ahead": False,
+                    "error": f"No answer within {timeout:g} seconds"}
+
+    engines = database_engines()
+    results = await asyncio.gather(*(check(engine) for engine in engines.values()))
+    return dict(zip(engines, results))
+
+
+def _pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    stats = {"status": pool.status()}
+    # QueuePool exposes these; SingletonThreadPool and StaticPool do not
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+
+def pool_stats() -> dict[str, dict]:
+    """Connection pool state of every engine created so far; none are created here."""
+    pools = {}
+    if get_engine.cache_info().currsize:
+        pools["primary"] = _pool_stats(get_engine())
+    if get_replica_router.cache_info().currsize and get_replica_router() is not None:
+        for i, replica in enumerate(get_replica_router().engines):
+            pools[f"replica-{i}"] = _pool_stats(replica)
+    if get_shard_map.cache_info().currsize and get_shard_map() is not None:
+        for location, shard in get_shard_map().engines.items():
+            pools[f"shard-{location}"] = _pool_stats(shard)
+    return pools
+
+
+async def event_loop_lag_ms() -> float:
+    """How long a callback waits for the event loop right now."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.sleep(0)
+    return round((loop.time() - started) * 1000, 3)
+
+
+def allocation_report(action: Optional[str] = None, top: int = 0) -> dict:
+    """Start or stop tracemalloc, and list the ``top`` allocation sites while it traces.
+
+    Tracing slows allocations down, so it stays off until asked for.
+    """
+    if action == "start" and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    elif action == "stop" and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+    report = {"tracing": tracemalloc.is_tracing()}
+    if not report["tracing"]:
+        return report
+    current, peak = tracemalloc.get_traced_memory()
+    report["current_kb"] = round(current / 1024, 1)
+    report["peak_kb"] = round(peak / 1024, 1)
+    if top:
+        snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        report["top"] = [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:top]
+        ]
+    return report
+
+
+async def runtime_snapshot(tracemalloc_action: Optional[str] = None, top: int = 0) -> dict:
+    return {
+        "pools": pool_stats(),
+        "threads": {
+            "count": threading.active_count(),
+            "names": sorted(thread.name for thread in threading.enumerate()),
+        },
+        "event_loop_lag_ms": await event_loop_lag_ms(),
+        "gc": {
+            "enabled": gc.isenabled(),
+            "counts": gc.get_count(),
+            "generations": gc.get_stats(),
+        },
+        "tracemalloc": await run_in_threadpool(allocation_report, tracemalloc_action, top),
+        "events": {
+            "subscribers": broker.subscriber_count(),
+            "queue_depths": broker.queue_depths(),
+            "max_queue_size": broker.max_queue_size,
+        },
+        "concurrency": concurrency_limiter.snapshot(),
+    }
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, exists, or_, select
+from sqlalchemy.orm import Session
+
+from tdcs_dance_svc.config import HOLD_SWEEP_SECONDS
+from tdcs_dance_svc.models.appointment import Appointment, AppointmentHold
+from tdcs_dance_svc.models.base import get_sessionmaker, scatter_gather
+
+
+def slot_conflict(start: datetime, end: datetime, now: datetime):
+    """A single statement that is true when [start, end) overlaps an appointment or an active hold."""
+    return select(or_(
+        exists().where(Appointment.start_time < end, Appointment.end_time > start),
+        exists().where(
+            AppointmentHold.start_time < end,
+            AppointmentHold.end_time > start,
+            AppointmentHold.expires_at > now
+        ),
+    ))
+
+
+def slot_taken(db: Session, start: datetime, end: datetime, now: datetime) -> bool:
+    return bool(db.scalar(slot_conflict(start, end, now)))
+
+
+def claim_hold(db: Session, hold_id: int, user_id: int, start: datetime, end: datetime, now: datetime) -> bool:
+    """Delete an active hold for exactly this user and slot, in the caller's transaction.
+
+    Returns False when the hold expired, was already used or was taken for another slot. Once
+    claimed, the hold no longer blocks the slot for the booking that follows; if that booking
+    is rolled back, so is the claim.
+    """
+    claimed = db.execute(
+        delete(AppointmentHold).where(
+            AppointmentHold.id == hold_id,
+            AppointmentHold.user_id == user_id,
+            AppointmentHold.start_time == start,
+            AppointmentHold.end_time == end,
+            AppointmentHold.expires_at > now
+        ).returning(AppointmentHold.id).execution_options(synchronize_session=False)
+    ).first()
+    return claimed is not None
+
+
+def expire_holds(db: Session, now: datetime) -> int:
+    """Delete expired holds with one statement on the ``expires_at`` index.
+
+    Expired holds no longer block their slots, so deleting them does not change the schedule
+    version; the version already moved on when they expired.
+    """
+    result = db.execute(
+        delete(AppointmentHold).where(AppointmentHold.expires_at <= now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def sweep_expired_holds() -> dict[str, int]:
+    db = get_sessionmaker()()
+    try:
+        return scatter_gather(lambda session: expire_holds(session, datetime.now(timezone.utc)), db)
+    finally:
+        db.close()
+
+
+async def run_hold_sweeper(interval: float = HOLD_SWEEP_SECONDS) -> None:
+    """Expire holds every ``interval`` seconds until cancelled.
+
+    Expired holds already stop blocking slots, so the sweeper only keeps the table small.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            expired = await run_in_threadpool(sweep_expired_holds)
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            continue
+        for location, count in expired.items():
+            if count:
+                logging.info(f"Expired {count} appointment holds at {location}")
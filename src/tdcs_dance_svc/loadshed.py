@@ -0,0 +1,247 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+
+from tdcs_dance_svc.config import (
+    CONCURRENCY_INITIAL_LIMIT,
+    CONCURRENCY_LATENCY_TARGET_MS,
+    CONCURRENCY_MAX_LIMIT,
+    CONCURRENCY_MIN_LIMIT,
+    LOAD_SHED_PATHS,
+    OVERLOAD_WINDOW_SECONDS,
+    REQUEST_DEADLINE_SECONDS,
+)
+
+# SQLite checks the progress handler every this many virtual machine instructions
+SQLITE_PROGRESS_STEPS = 1000
+# Postgres SQLSTATE for a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+# Per-dialect statement that passes the remaining time, in milliseconds, to the database.
+# It is sent once per transaction; SET LOCAL lapses when the transaction ends
+DEADLINE_STATEMENTS = {
+    "postgresql": "SET LOCAL statement_timeout = {ms}",
+}
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of time before a statement could be sent to the database."""
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def statement_deadline(seconds: float):
+    """Give statements run in this block ``seconds`` to finish, as a request deadline does."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def is_overload_error(e: BaseException) -> bool:
+    """True for errors caused by a slow or saturated database rather than a bug."""
+    if isinstance(e, (DeadlineExceeded, PoolTimeoutError)):
+        return True
+    if isinstance(e, DBAPIError):
+        if getattr(e.orig, "pgcode", None) == QUERY_CANCELED:
+            return True
+        # sqlite3 reports an aborted progress handler as "interrupted"
+        return "interrupted" in str(e.orig).lower()
+    return False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    deadline = _deadline.get()
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        # Set or clear on every statement, so a handler left by a failed statement never
+        # outlives its request on a pooled connection
+        handler = None if deadline is None else (lambda: int(time.monotonic() > deadline))
+        conn.connection.driver_connection.set_progress_handler(handler, SQLITE_PROGRESS_STEPS)
+    if deadline is None:
+        return
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"Request deadline passed before: {statement}")
+    deadline_statement = DEADLINE_STATEMENTS.get(dialect)
+    if deadline_statement is not None and conn.info.get("transaction_deadline") != deadline:
+        # Mark it first: the statement goes through these hooks too, so the profiler counts it
+        conn.info["transaction_deadline"] = deadline
+        conn.exec_driver_sql(deadline_statement.format(ms=max(1, int(remaining * 1000))))
+
+
+def _begin(conn):
+    # A new transaction starts without the previous one's SET LOCAL
+    conn.info.pop("transaction_deadline", None)
+
+
+def enable_statement_deadlines() -> None:
+    """Pass each request's remaining time to the database as a statement timeout.
+
+    Postgres gets ``SET LOCAL statement_timeout`` with the time left at the first statement
+    of each transaction, and every statement is still checked against the deadline before it
+    is sent. SQLite aborts the statement from a progress handler. Statements outside of a
+    request (CLI, background tasks) have no deadline and are left alone.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "begin", _begin)
+
+
+def disable_statement_deadlines() -> None:
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "begin", _begin)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Caps in-flight requests with a limit that follows observed latency (AIMD).
+
+    A response slower than ``latency_target_ms``, or a 503 from a statement timeout, cuts the
+    limit by ``backoff``, at most once per ``latency_target_ms`` so one burst of slow requests
+    counts once. Every fast response grows the limit by about one per limit's worth of
+    requests. Requests over the limit are rejected at once instead of queueing for a thread.
+    """
+
+    def __init__(self, initial_limit: int = CONCURRENCY_INITIAL_LIMIT, min_limit: int = CONCURRENCY_MIN_LIMIT,
+                 max_limit: int = CONCURRENCY_MAX_LIMIT, latency_target_ms: float = CONCURRENCY_LATENCY_TARGET_MS,
+                 backoff: float = 0.9, overload_window_seconds: float = OVERLOAD_WINDOW_SECONDS):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target_ms / 1000
+        self.backoff = backoff
+        self.overload_window_seconds = overload_window_seconds
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._limit = float(self.initial_limit)
+            self.in_flight = 0
+            self.shed_total = 0
+            self._last_decrease = 0.0
+            self._last_shed: Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.shed_total += 1
+                self._last_shed = time.monotonic()
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: Optional[float], overloaded: bool = False) -> None:
+        """Free a slot and adjust the limit to how the request went.
+
+        ``latency`` is None for requests whose duration says nothing about load, such as bulk
+        imports; only an overload response from them cuts the limit.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            if latency is None and not overloaded:
+                return
+            if overloaded or latency > self.latency_target:
+                if now - self._last_decrease >= self.latency_target:
+                    self._limit = max(self.min_limit, self._limit * self.backoff)
+                    self._last_decrease = now
+            else:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    def overloaded(self) -> bool:
+        """True while requests are being shed, or were shed within the overload window."""
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return True
+            return self._last_shed is not None and time.monotonic() - self._last_shed < self.overload_window_seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "shed_total": self.shed_total,
+            }
+
+
+class LoadSheddingMiddleware:
+    """ASGI middleware that admits DB-bound requests through the concurrency limiter.
+
+    Admitted requests get a deadline of ``deadline_seconds`` that statements must finish
+    within, and their latency, taken at the start of the response, adjusts the limit. Bulk
+    routes in ``bulk`` still take a slot but get no deadline, and their latency is left out
+    so one long import does not shrink the limit for everyone else. Requests over the limit
+    get an immediate 503 with Retry-After.
+    """
+
+    def __init__(self, app, limiter: AdaptiveConcurrencyLimiter, paths: tuple[str, ...] = LOAD_SHED_PATHS,
+                 exclude: tuple[str, ...] = ("/appointments/stream",),
+                 bulk: tuple[str, ...] = ("/appointments/export", "/appointments/import"),
+                 deadline_seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.app = app
+        self.limiter = limiter
+        self.paths = paths
+        self.exclude = exclude
+        self.bulk = bulk
+        self.deadline_seconds = deadline_seconds
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (scope["type"] != "http" or not path.startswith(self.paths)
+                or path.startswith(self.exclude)):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.try_acquire():
+            logging.warning(f"Shedding {scope['method']} {path}: {self.limiter.snapshot()}")
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Service is overloaded, try again shortly"},
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        bulk = path.startswith(self.bulk)
+        released = False
+
+        def release(overloaded: bool) -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.limiter.release(None if bulk else time.monotonic() - started, overloaded)
+
+        async def send_and_measure(message):
+            if message["type"] == "http.response.start":
+                release(message["status"] == status.HTTP_503_SERVICE_UNAVAILABLE)
+            await send(message)
+
+        deadline = None if bulk else started + self.deadline_seconds
+        token = _deadline.set(deadline)
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            _deadline.reset(token)
+            release(False)
+
+
+concurrency_limiter = AdaptiveConcurrencyLimiter()
+enable_statement_deadlines()
@@ -0,0 +1,140 @@
+import argparse
+import csv
+import logging
+import sys
+
+from tdcs_dance_svc.appointment_import import STATUS_IMPORTED, import_appointments
+from tdcs_dance_svc.archive import archive_cutoff, archive_past_appointments
+from tdcs_dance_svc.config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, DATABASE_URL, IMPORT_BATCH_SIZE
+from tdcs_dance_svc.models.base import get_sessionmaker, scatter_gather, session_for
+
+
+logging.basicConfig(level=logging.INFO)
+
+
+def run_archive(args: argparse.Namespace) -> int:
+    cutoff = archive_cutoff(days=args.older_than_days)
+    db = get_sessionmaker()()
+    try:
+        # Every shard archives its own appointments
+        moved = scatter_gather(
+            lambda session: archive_past_appointments(session, cutoff, batch_size=args.batch_size), db
+        )
+    finally:
+        db.close()
+    for location, count in moved.items():
+        logging.info(f"Moved {count} appointments at {location} that ended before {cutoff.isoformat()} to the archive")
+    return 0
+
+
+def run_import(args: argparse.Namespace) -> int:
+    db = session_for(args.location)
+    try:
+        with open(args.path, newline="", encoding="utf-8-sig") as source:
+            results = import_appointments(db, source, notify=args.notify, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    report = open(args.report, "w", newline="") if args.report else sys.stdout
+    try:
+        writer = csv.DictWriter(report, fieldnames=["row", "status", "appointment_id", "error"])
+        writer.writeheader()
+        writer.writerows(results)
+    finally:
+        if report is not sys.stdout:
+            report.close()
+
+    imported = sum(1 for result in results if result["status"] == STATUS_IMPORTED)
+    logging.info(f"Imported {imported} of {len(results)} rows from {args.path}")
+    return 0 if imported == len(results) else 1
+
+
+def run_generate(args: argparse.Namespace) -> int:
+    from sqlalchemy import create_engine
+    from tdcs_dance_svc.perf import generate_appointments, load_appointments
+
+    engine = create_engine(args.database_url)
+    try:
+        loaded = load_appointments(engine, generate_appointments(args.rows, seed=args.seed, users=args.users))
+    finally:
+        engine.dispose()
+    logging.info(f"Loaded {loaded} synthetic appointments into {engine.url.render_as_string()}")
+    return 0
+
+
+def run_perf_check(args: argparse.Namespace) -> int:
+    from sqlalchemy import create_engine, func, select
+    from tdcs_dance_svc.models.appointment import Appointment
+    from tdcs_dance_svc.perf import generate_appointments, load_appointments, migrate, run_harness
+
+    migrate(args.database_url, args.alembic_config)
+    engine = create_engine(args.database_url)
+    try:
+        with engine.connect() as connection:
+            existing = connection.execute(select(func.count()).select_from(Appointment)).scalar_one()
+        if existing == 0:
+            load_appointments(engine, generate_appointments(args.rows, seed=args.seed, users=args.users))
+        results = run_harness(engine, max_ms=args.max_ms)
+    finally:
+        engine.dispose()
+
+    failed = False
+    for result in results:
+        print(f"== {result['name']}: {result['median_ms']:.2f} ms")
+        print(result["plan"])
+        for issue in result["issues"]:
+            failed = True
+            print(f"!! {issue}")
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="tdcs_dance_svc_maintenance",
+                                     description="Maintenance tasks for the dance service database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    archive = subparsers.add_parser("archive", help="Move finished appointments to the archive table")
+    archive.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS,
+                         help="Archive appointments that ended more than this many days ago")
+    archive.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    archive.set_defaults(handler=run_archive)
+
+    importer = subparsers.add_parser("import", help="Bulk import appointments from a CSV file")
+    importer.add_argument("path", help="CSV with user_id, start_time, end_time and timezone columns")
+    importer.add_argument("--notify", action="store_true",
+                          help="Schedule reminders and notify instructors for imported appointments")
+    importer.add_argument("--report", help="Write the per-row report to this file instead of stdout")
+    importer.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    importer.add_argument("--location", help="Shard to import into; required when DATABASE_SHARDS is set")
+    importer.set_defaults(handler=run_import)
+
+    generate = subparsers.add_parser("generate", help="Bulk load deterministic synthetic appointments")
+    generate.add_argument("--database-url", default=DATABASE_URL)
+    generate.add_argument("--rows", type=int, default=1_000_000)
+    generate.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--users", type=int, default=5000)
+    generate.set_defaults(handler=run_generate)
+
+    perf_check = subparsers.add_parser(
+        "perf-check",
+        help="Migrate a scratch database to head, load synthetic data and check the hot query plans"
+    )
+    perf_check.add_argument("--database-url", default="sqlite:///perf_check.db")
+    perf_check.add_argument("--alembic-config", default="alembic.ini")
+    perf_check.add_argument("--rows", type=int, default=1_000_000)
+    perf_check.add_argument("--seed", type=int, default=42)
+    perf_check.add_argument("--users", type=int, default=5000)
+    perf_check.add_argument("--max-ms", type=float, default=None,
+                            help="Also fail when a query's median time exceeds this many milliseconds")
+    perf_check.set_defaults(handler=run_perf_check)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1 +1,2 @@
-from .base import Base, get_db
\ No newline at end of file
+from .base import Base, get_db
+from .appointment import Appointment, AppointmentHold, ArchivedAppointment, ScheduleVersion
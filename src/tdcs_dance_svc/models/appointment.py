@@ -1,12 +1,61 @@
-from sqlalchemy import Column, Integer, DateTime, String
-from tdcs_dance_svc.models.base import Base
+from sqlalchemy import Column, Integer, Index, String
+from tdcs_dance_svc.models.base import Base, UTCDateTime
 
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Serves per-user listings in start order without a sort step
+        Index("ix_appointments_user_id_start_time", "user_id", "start_time"),
+        # Archived rows keep their id, so SQLite must never hand out the id of a deleted row again
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    start_time = Column(UTCDateTime(), index=True, nullable=False)
+    end_time = Column(UTCDateTime(), index=True, nullable=False)
+    timezone = Column(String, nullable=False)
+
+
+class ArchivedAppointment(Base):
+    """Finished appointments moved out of the hot ``appointments`` table.
+
+    Rows keep their original id so lookups and exports can still find them.
+    """
+    __tablename__ = "appointments_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
     user_id = Column(Integer, index=True, nullable=False)
-    start_time = Column(DateTime, index=True, nullable=False)
-    end_time = Column(DateTime, index=True, nullable=False)
+    start_time = Column(UTCDateTime(), index=True, nullable=False)
+    end_time = Column(UTCDateTime(), nullable=False)
     timezone = Column(String, nullable=False)
+
+
+class AppointmentHold(Base):
+    """A short-lived claim on a slot while the client completes checkout.
+
+    A hold blocks the slot until ``expires_at``; expired rows are ignored by the conflict
+    check and deleted by the hold sweeper.
+    """
+    __tablename__ = "appointment_holds"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    start_time = Column(UTCDateTime(), index=True, nullable=False)
+    end_time = Column(UTCDateTime(), nullable=False)
+    expires_at = Column(UTCDateTime(), index=True, nullable=False)
+
+
+class ScheduleVersion(Base):
+    """A counter per location, bumped in the same transaction as every write to its schedule.
+
+    Reads use it as their ETag, so every worker agrees on it. ``next_expiry`` is the earliest
+    hold expiry not yet counted, since an expiring hold frees its slot without a write.
+    """
+    __tablename__ = "schedule_versions"
+
+    location = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    next_expiry = Column(UTCDateTime(), nullable=True)
+
@@ -1,19 +1,318 @@
-from sqlalchemy import Column, PrimaryKeyConstraint, String
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from threading import Lock
+from typing import Callable, Optional, TypeVar
+
+from fastapi import Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy import Column, DateTime, PrimaryKeyConstraint, String, TypeDecorator, text
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker, Session
 
-from tdcs_dance_svc.config import DATABASE_URL
+from tdcs_dance_svc.config import (
+    DATABASE_URL,
+    DATABASE_REPLICA_URLS,
+    DATABASE_REPLICA_RETRY_SECONDS,
+    DATABASE_SHARDS,
+    DATABASE_STICKY_SECONDS,
+    SHARD_QUERY_WORKERS,
+)
+from tdcs_dance_svc.loadshed import is_overload_error
 
 Base = declarative_base()
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+
+class UTCDateTime(TypeDecorator):
+    """A ``DateTime(timezone=True)`` column that always reads back as an aware UTC datetime.
+
+    SQLite stores no offset, so values are written in UTC and get their offset back on the
+    way out; Postgres already returns them aware.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+# Name reported for the primary database when no shards are configured
+DEFAULT_LOCATION = "default"
+
+T = TypeVar("T")
+
+
+class ReplicaRouter:
+    """Round-robin selection over read replicas with passive health checks.
+
+    A replica that fails is taken out of rotation for ``retry_seconds``; once that expires it
+    is pinged with ``SELECT 1`` before it receives traffic again.
+    """
+
+    def __init__(self, engines: list[Engine], retry_seconds: float = DATABASE_REPLICA_RETRY_SECONDS):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._down_until = {id(e): 0.0 for e in engines}
+        self._counter = itertools.count()
+        self._lock = Lock()
+
+    def pick(self) -> Optional[Engine]:
+        for _ in range(len(self.engines)):
+            with self._lock:
+                candidate = self.engines[next(self._counter) % len(self.engines)]
+                down_until = self._down_until[id(candidate)]
+            if down_until == 0.0:
+                return candidate
+            if time.monotonic() >= down_until and self.ping(candidate):
+                return candidate
+        return None
+
+    def ping(self, candidate: Engine) -> bool:
+        try:
+            with candidate.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            self.mark_down(candidate)
+            return False
+        with self._lock:
+            self._down_until[id(candidate)] = 0.0
+        return True
+
+    def mark_down(self, candidate: Engine) -> None:
+        with self._lock:
+            self._down_until[id(candidate)] = time.monotonic() + self.retry_seconds
+
+
+class ShardMap:
+    """Maps each studio location to the engine of the database that holds its schedule.
+
+    Appointments never conflict across locations, so every booking touches exactly one shard.
+    Ids are only unique within a shard.
+    """
+
+    def __init__(self, engines: dict[str, Engine]):
+        self.engines = engines
+
+    @property
+    def locations(self) -> list[str]:
+        return list(self.engines)
+
+    def engine_for(self, location: str) -> Optional[Engine]:
+        return self.engines.get(location)
+
+
+class ReplicaSession(Session):
+    """Session on a read replica that fails over to the primary.
+
+    Routes turn database errors into HTTP errors before a dependency could see them, so the
+    failover happens here: an operational error on the replica takes it out of rotation and
+    the statement is retried on ``primary``. Statement timeouts are not failures of the
+    replica and are raised as they are.
+    """
+
+    def __init__(self, replica: Engine, replica_router: "ReplicaRouter", primary: Engine):
+        super().__init__(bind=replica)
+        self.replica = replica
+        self.replica_router = replica_router
+        self.primary = primary
+
+    def _execute_internal(self, statement, *args, **kwargs):
+        # execute, scalar, scalars, get and Query all funnel through here
+        try:
+            return super()._execute_internal(statement, *args, **kwargs)
+        except OperationalError as e:
+            if self.bind is not self.replica or is_overload_error(e):
+                raise
+            logging.error(e, exc_info=True)
+            self.replica_router.mark_down(self.replica)
+            self.rollback()
+            self.bind = self.primary
+            return super()._execute_internal(statement, *args, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """Create the primary engine on first use rather than at import time."""
+    return create_engine(DATABASE_URL)
+
+
+@lru_cache(maxsize=None)
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=get_engine())
+
+
+@lru_cache(maxsize=None)
+def get_replica_router() -> Optional[ReplicaRouter]:
+    if not DATABASE_REPLICA_URLS:
+        return None
+    return ReplicaRouter([create_engine(url) for url in DATABASE_REPLICA_URLS])
+
+
+@lru_cache(maxsize=None)
+def get_shard_map() -> Optional[ShardMap]:
+    if not DATABASE_SHARDS:
+        return None
+    return ShardMap({location: create_engine(url) for location, url in DATABASE_SHARDS.items()})
+
+
+def dispose_engines() -> None:
+    """Close pooled connections of any engines that were created; used on shutdown."""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    if get_replica_router.cache_info().currsize and get_replica_router() is not None:
+        for replica in get_replica_router().engines:
+            replica.dispose()
+    if get_shard_map.cache_info().currsize and get_shard_map() is not None:
+        for shard in get_shard_map().engines.values():
+            shard.dispose()
+
+
+def __getattr__(name: str):
+    # ``engine`` and ``SessionLocal`` used to be module globals; keep them importable
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db() -> Session:
-    session = scoped_session(sessionmaker(bind=engine))
+    session = scoped_session(get_sessionmaker())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _shard_session(location: str, engine: Engine) -> Session:
+    session = Session(bind=engine)
+    session.info["location"] = location
+    return session
+
+
+def session_location(db: Session) -> str:
+    """The location whose shard ``db`` is bound to; ``DEFAULT_LOCATION`` when unsharded."""
+    return db.info.get("location", DEFAULT_LOCATION)
+
+
+def session_for(location: Optional[str]) -> Session:
+    """Open a session outside of a request: on the location's shard, or the primary when unsharded."""
+    shard_map = get_shard_map()
+    if shard_map is None:
+        return get_sessionmaker()()
+    engine = shard_map.engine_for(location) if location else None
+    if engine is None:
+        raise ValueError(f"Unknown location {location!r}; expected one of {', '.join(shard_map.locations)}")
+    return _shard_session(location, engine)
+
+
+def known_location(location: Optional[str]) -> Optional[str]:
+    """``location`` checked against the shards; None when it is not given or there are no shards."""
+    shard_map = get_shard_map()
+    if shard_map is None or location is None:
+        return None
+    if shard_map.engine_for(location) is None:
+        raise ValueError(f"Unknown location {location!r}; expected one of {', '.join(shard_map.locations)}")
+    return location
+
+
+def get_shard_db(location: Optional[str] = Query(None),
+                 x_location: Optional[str] = Header(None),
+                 db: Session = Depends(get_db)) -> Session:
+    """Session on the shard that owns the request's location.
+
+    The location comes from the ``X-Location`` header or the ``location`` query parameter.
+    Without configured shards the location is ignored and the primary session is used.
+    """
+    shard_map = get_shard_map()
+    if shard_map is None:
+        yield db
+        return
+
+    location = x_location or location
+    if not location:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A location is required")
+    engine = shard_map.engine_for(location)
+    if engine is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown location")
+
+    session = _shard_session(location, engine)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def scatter_gather(query: Callable[[Session], T], db: Session) -> dict[str, T]:
+    """Run ``query`` against every shard in parallel and return its results by location.
+
+    Each shard gets its own session on a worker thread. Without configured shards the query
+    runs once on ``db`` and its result is reported under ``DEFAULT_LOCATION``.
+    """
+    shard_map = get_shard_map()
+    if shard_map is None:
+        return {DEFAULT_LOCATION: query(db)}
+
+    def run(location: str) -> T:
+        session = _shard_session(location, shard_map.engine_for(location))
+        try:
+            return query(session)
+        finally:
+            session.close()
+
+    workers = max(1, min(SHARD_QUERY_WORKERS, len(shard_map.locations)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shard-query") as executor:
+        futures = {location: executor.submit(run, location) for location in shard_map.locations}
+        return {location: future.result() for location, future in futures.items()}
+
+
+def mark_primary_sticky(response: Response) -> None:
+    """Pin the caller's reads to the primary for a short while so they see their own writes."""
+    sticky_until = time.time() + DATABASE_STICKY_SECONDS
+    response.set_cookie(key=PRIMARY_STICKY_COOKIE, value=f"{sticky_until:.3f}",
+                        max_age=int(DATABASE_STICKY_SECONDS) + 1, httponly=True)
+
+
+def _is_primary_sticky(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request, db: Session = Depends(get_shard_db)) -> Session:
+    """Session for read-only routes.
+
+    Uses a healthy replica when replicas are configured and the caller has not written
+    recently; otherwise falls back to the primary session from ``get_db``. The primary
+    session does not connect unless it is used, so the fallback costs nothing. Replicas
+    belong to the unsharded primary; with shards, reads go to the location's shard.
+    """
+    replica = None
+    replica_router = get_replica_router()
+    if replica_router is not None and get_shard_map() is None and not _is_primary_sticky(request):
+        replica = replica_router.pick()
+    if replica is None:
+        yield db
+        return
+
+    session = ReplicaSession(replica, replica_router, primary=db.get_bind())
     try:
         yield session
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
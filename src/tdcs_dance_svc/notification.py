@@ -1,8 +1,9 @@
 import os
 import logging
-import requests
 from typing import Any
 
+from tdcs_dance_svc.templating import appointment_context, render
+
 
 def notify_instructor(appointment: Any) -> None:
     """Send a notification to the instructor about a new appointment.
@@ -10,7 +11,7 @@ def notify_instructor(appointment: Any) -> None:
     If the environment variable INSTRUCTOR_NOTIFICATION_URL is set, a POST request will be sent.
     Otherwise, the notification message is logged using logging.info.
     """
-    message = f"New appointment booked: ID {appointment.id} starting at {appointment.start_time}"
+    message = render("new_appointment", appointment_context(appointment)).text
     notification_url = os.getenv("INSTRUCTOR_NOTIFICATION_URL")
 
     if not notification_url:
@@ -29,6 +30,9 @@ def notify_instructor(appointment: Any) -> None:
     if api_key:
         headers["Authorization"] = f"Bearer {api_key}"
 
+    # Imported here so the HTTP client is only loaded when an integration is configured
+    import requests
+
     try:
         response = requests.post(notification_url, json=payload, headers=headers, timeout=5)
         if response.status_code != 200:
@@ -0,0 +1,192 @@
+import csv
+import io
+import logging
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from tdcs_dance_svc.holds import slot_conflict
+from tdcs_dance_svc.models.appointment import Appointment
+
+PERF_TIMEZONES = (
+    "UTC", "America/New_York", "America/Los_Angeles", "Europe/London",
+    "Europe/Madrid", "Asia/Seoul", "Asia/Tokyo", "Australia/Sydney",
+)
+LOAD_COLUMNS = ("user_id", "start_time", "end_time", "timezone")
+
+# Fixed "now" for generated data and harness queries, so runs are comparable
+PERF_ANCHOR = datetime(2026, 1, 1, tzinfo=timezone.utc)
+GAP_MINUTES = (0, 0, 15, 30, 60, 240, 900)
+DURATION_MINUTES = (30, 45, 60, 60, 90, 120)
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+}
+
+
+def generate_appointments(count: int, seed: int = 42, users: int = 5000, lanes: int = 50,
+                          anchor: datetime = PERF_ANCHOR, history_share: float = 0.8) -> Iterator[dict]:
+    """Yield ``count`` synthetic appointments, identical for the same arguments.
+
+    Appointments are laid out on ``lanes`` parallel schedules (studios or instructors), each a
+    run of lessons of 30 to 120 minutes with random gaps. The schedules start early enough that
+    roughly ``history_share`` of the rows end before ``anchor`` and the rest are future
+    bookings. Rows are meant to be bulk loaded and bypass the booking conflict check.
+    """
+    rng = random.Random(seed)
+    mean_step = statistics.mean(GAP_MINUTES) + statistics.mean(DURATION_MINUTES)
+    origin = anchor - timedelta(minutes=mean_step * count / lanes * history_share)
+    lane_clock = [origin + timedelta(minutes=rng.randrange(0, 600)) for _ in range(lanes)]
+    for i in range(count):
+        lane = i % lanes
+        begin = lane_clock[lane] + timedelta(minutes=rng.choice(GAP_MINUTES))
+        end = begin + timedelta(minutes=rng.choice(DURATION_MINUTES))
+        lane_clock[lane] = end
+        yield {
+            "user_id": rng.randrange(1, users + 1),
+            "start_time": begin,
+            "end_time": end,
+            "timezone": rng.choice(PERF_TIMEZONES),
+        }
+
+
+def _batched(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_postgres(connection: Connection, batch: list[dict]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow([row[column].isoformat() if isinstance(row[column], datetime) else row[column]
+                         for column in LOAD_COLUMNS])
+    statement = f"COPY appointments ({', '.join(LOAD_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = connection.connection.cursor()
+    try:
+        if connection.dialect.driver == "psycopg2":
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+        else:
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def load_appointments(engine: Engine, rows: Iterable[dict], batch_size: int = 10000) -> int:
+    """Bulk load rows with COPY on Postgres and executemany elsewhere. Returns the row count."""
+    loaded = 0
+    use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver in ("psycopg2", "psycopg")
+    for batch in _batched(rows, batch_size):
+        with engine.begin() as connection:
+            if use_copy:
+                _copy_postgres(connection, batch)
+            else:
+                connection.execute(insert(Appointment), batch)
+        loaded += len(batch)
+        logging.info(f"Loaded {loaded} appointments")
+    if engine.dialect.name in ("sqlite", "postgresql"):
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+    return loaded
+
+
+def harness_queries(now: datetime) -> dict:
+    """The hot queries of the service, built the same way the routes build them."""
+    slot_start = now + timedelta(days=3)
+    slot_end = slot_start + timedelta(hours=1)
+    return {
+        "booking_conflict": slot_conflict(slot_start, slot_end, now),
+        "lookup": select(Appointment).where(Appointment.id == 12345),
+        "listing_by_user": select(Appointment).where(Appointment.user_id == 42)
+        .order_by(Appointment.start_time, Appointment.id).limit(100),
+        "listing_by_range": select(Appointment).where(
+            Appointment.end_time > now, Appointment.start_time < now + timedelta(days=7)
+        ).order_by(Appointment.start_time, Appointment.id).limit(100),
+    }
+
+
+def plan_issues(dialect: str, plan: str) -> list[str]:
+    """Flag plan steps that a missing index would explain: whole-table reads and full sorts."""
+    issues = []
+    for line in plan.splitlines():
+        step = line.strip()
+        if dialect == "sqlite":
+            # SCAN CONSTANT ROW is the FROM-less outer SELECT around EXISTS subqueries
+            if step.startswith("SCAN ") and "INDEX" not in step and step != "SCAN CONSTANT ROW":
+                issues.append(f"full table scan: {step}")
+            elif step == "USE TEMP B-TREE FOR ORDER BY":
+                issues.append(f"sort not served by an index: {step}")
+        elif dialect == "postgresql" and "Seq Scan on" in step:
+            issues.append(f"sequential scan: {step}")
+    return issues
+
+
+def run_harness(engine: Engine, repeat: int = 5, now: datetime = PERF_ANCHOR,
+                max_ms: Optional[float] = None) -> list[dict]:
+    """Time each hot query, capture its plan and flag likely missing indexes.
+
+    When ``max_ms`` is given, a query whose median time exceeds it is flagged as well.
+    """
+    prefix = EXPLAIN_PREFIXES.get(engine.dialect.name)
+    results = []
+    with engine.connect() as connection:
+        for name, query in harness_queries(now).items():
+            sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                connection.exec_driver_sql(sql).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            plan = ""
+            if prefix:
+                rows = connection.exec_driver_sql(prefix + sql).all()
+                # SQLite returns (id, parent, notused, detail); Postgres returns one text column
+                plan = "\n".join(str(row[-1]) for row in rows)
+            median_ms = statistics.median(timings)
+            issues = plan_issues(engine.dialect.name, plan)
+            if max_ms is not None and median_ms > max_ms:
+                issues.append(f"median {median_ms:.2f} ms is over the {max_ms:.2f} ms budget")
+            results.append({
+                "name": name,
+                "median_ms": median_ms,
+                "plan": plan,
+                "issues": issues,
+            })
+    return results
+
+
+def migrate(database_url: str, alembic_config: str = "alembic.ini") -> None:
+    """Run the Alembic migrations up to head against ``database_url``."""
+    from alembic import command
+    from alembic.config import Config
+
+    # migrations/env.py takes the URL from the environment
+    previous = os.environ.get("DATABASE_URL")
+    os.environ["DATABASE_URL"] = database_url
+    config = Config(alembic_config)
+    # script_location is relative to the ini file, not the working directory
+    config.set_main_option("script_location", os.path.join(
+        os.path.dirname(os.path.abspath(alembic_config)), config.get_main_option("script_location")
+    ))
+    try:
+        command.upgrade(config, "head")
+    finally:
+        if previous is None:
+            del os.environ["DATABASE_URL"]
+        else:
+            os.environ["DATABASE_URL"] = previous
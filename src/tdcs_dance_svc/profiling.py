@@ -0,0 +1,146 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from tdcs_dance_svc.config import SQL_PROFILING, SQL_REPEAT_THRESHOLD, SQL_SLOW_QUERY_MS
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = 2) -> dict[str, int]:
+        return {statement: n for statement, n in self.statements.items() if n >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None:
+        return None
+    # Use a separate DBAPI cursor so the explain does not re-enter these event hooks
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    elapsed = time.perf_counter() - started
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= query_profiler.slow_query_ms:
+        plan = None
+        if not executemany:
+            try:
+                plan = _explain(conn, statement, parameters)
+            except Exception as e:
+                logging.error(e, exc_info=True)
+        logging.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement}\nPlan:\n{plan}")
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time here
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+class QueryProfiler:
+    """Opt-in statement counting and slow-query logging through SQLAlchemy engine events.
+
+    The hooks are attached to the ``Engine`` class so that the primary engine, replicas and any
+    test engines are all covered. Nothing is attached until ``enable`` is called.
+    """
+
+    def __init__(self, slow_query_ms: float = SQL_SLOW_QUERY_MS, repeat_threshold: int = SQL_REPEAT_THRESHOLD):
+        self.slow_query_ms = slow_query_ms
+        self.repeat_threshold = repeat_threshold
+        self.enabled = False
+
+    def enable(self) -> None:
+        if not self.enabled:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(Engine, "handle_error", _handle_error)
+            self.enabled = True
+
+    def disable(self) -> None:
+        if self.enabled:
+            event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.remove(Engine, "handle_error", _handle_error)
+            self.enabled = False
+
+
+class QueryProfilerMiddleware:
+    """Collect per-request query stats and report them in debug response headers.
+
+    Adds ``X-DB-Statements``, ``X-DB-Time-Ms`` and ``X-DB-Repeated-Statements`` and logs a warning
+    when one statement runs ``repeat_threshold`` times or more in a request (a likely N+1).
+    """
+
+    def __init__(self, app, profiler: QueryProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                repeated = stats.repeated()
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-statements", str(stats.count).encode("latin-1")))
+                headers.append((b"x-db-time-ms", f"{stats.total_seconds * 1000:.2f}".encode("latin-1")))
+                headers.append((b"x-db-repeated-statements", str(len(repeated)).encode("latin-1")))
+                message = {**message, "headers": headers}
+                for statement, n in repeated.items():
+                    if n >= self.profiler.repeat_threshold:
+                        logging.warning(f"Statement ran {n} times in {scope['method']} {scope['path']}: {statement}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+
+
+query_profiler = QueryProfiler()
+if SQL_PROFILING:
+    query_profiler.enable()
@@ -0,0 +1,198 @@
+import logging
+import math
+import time
+from collections import Counter
+from threading import Lock
+from typing import Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+from tdcs_dance_svc.config import RATE_LIMITS, RATE_LIMIT_SHARDS
+
+
+class RateLimit:
+    """Allow ``capacity`` requests per ``period`` seconds, refilled continuously."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.period = period
+        self.refill_rate = capacity / period
+
+
+def parse_rate_limits(spec: str) -> dict[tuple[str, str], RateLimit]:
+    """Parse ``"POST /appointments/book=30/60;GET /auth/google/callback=10/60"``.
+
+    Each entry is ``METHOD PATH=CAPACITY/PERIOD_SECONDS``; malformed entries are logged and skipped.
+    """
+    limits = {}
+    for entry in spec.split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            route, rate = entry.rsplit("=", 1)
+            method, path = route.split()
+            capacity, period = rate.split("/")
+            limits[(method.upper(), path)] = RateLimit(int(capacity), float(period))
+        except ValueError:
+            logging.error(f"Ignoring malformed rate limit entry: {entry!r}")
+    return limits
+
+
+class ShardedBucketStore:
+    """Token buckets spread over independently locked shards.
+
+    Buckets are keyed by strings such as ``"ip:10.0.0.1"``; sharding keeps lock contention low
+    when many worker threads check limits at once. Each bucket keeps the limit it was created
+    with. Idle buckets that have refilled completely carry no state and are pruned when a shard
+    grows past ``max_keys_per_shard``.
+    """
+
+    def __init__(self, shards: int = RATE_LIMIT_SHARDS, max_keys_per_shard: int = 10000):
+        self._shards = [({}, Lock()) for _ in range(shards)]
+        self.max_keys_per_shard = max_keys_per_shard
+
+    def take(self, key: str, limit: RateLimit, now: Optional[float] = None) -> tuple[bool, float]:
+        """Consume one token. Returns (allowed, seconds until a token is available)."""
+        allowed, retry_after, _ = self.take_all([key], limit, now)
+        return allowed, retry_after
+
+    def take_all(self, keys: list[str], limit: RateLimit,
+                 now: Optional[float] = None) -> tuple[bool, float, list[str]]:
+        """Consume one token from every bucket in ``keys``, or from none of them.
+
+        A request rejected by one bucket does not spend tokens in the others. Returns
+        (allowed, seconds until every bucket has a token, keys whose bucket was empty).
+        """
+        now = time.monotonic() if now is None else now
+        shard_ids = sorted({hash(key) % len(self._shards) for key in keys})
+        # Locks are always taken in shard order, so two callers cannot deadlock
+        locks = [self._shards[i][1] for i in shard_ids]
+        for lock in locks:
+            lock.acquire()
+        try:
+            levels = {}
+            for key in keys:
+                buckets = self._shards[hash(key) % len(self._shards)][0]
+                tokens, updated, bucket_limit = buckets.get(key, (float(limit.capacity), now, limit))
+                levels[key] = (buckets, min(bucket_limit.capacity,
+                                            tokens + (now - updated) * bucket_limit.refill_rate), bucket_limit)
+            exhausted = [key for key, (_, tokens, _) in levels.items() if tokens < 1]
+            allowed = not exhausted
+            retry_after = 0.0
+            for key, (buckets, tokens, bucket_limit) in levels.items():
+                if allowed:
+                    tokens -= 1
+                elif tokens < 1:
+                    retry_after = max(retry_after, (1 - tokens) / bucket_limit.refill_rate)
+                buckets[key] = (tokens, now, bucket_limit)
+            for i in shard_ids:
+                buckets = self._shards[i][0]
+                if len(buckets) > self.max_keys_per_shard:
+                    self._prune(buckets, now)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        return allowed, retry_after, exhausted
+
+    @staticmethod
+    def _prune(buckets: dict, now: float) -> None:
+        for key, (tokens, updated, limit) in list(buckets.items()):
+            if tokens + (now - updated) * limit.refill_rate >= limit.capacity:
+                del buckets[key]
+
+    def reset(self) -> None:
+        for buckets, lock in self._shards:
+            with lock:
+                buckets.clear()
+
+
+class RateLimiter:
+    def __init__(self, limits: dict[tuple[str, str], RateLimit], store: Optional[ShardedBucketStore] = None):
+        self.limits = limits
+        self.store = store or ShardedBucketStore()
+        self.metrics: Counter = Counter()
+        self._metrics_lock = Lock()
+
+    def check(self, method: str, path: str, client_ip: Optional[str],
+              user_id: Optional[str]) -> Optional[float]:
+        """Return None if the request is admitted, else the Retry-After delay in seconds."""
+        limit = self.limits.get((method, path))
+        if limit is None:
+            return None
+        keys = []
+        if client_ip:
+            keys.append(("ip", f"ip:{client_ip}:{method} {path}"))
+        if user_id:
+            keys.append(("user", f"user:{user_id}:{method} {path}"))
+        if not keys:
+            return None
+        allowed, retry_after, exhausted = self.store.take_all([key for _, key in keys], limit)
+        if not allowed:
+            # The IP bucket is reported when both ran dry
+            key_type = next(key_type for key_type, key in keys if key in exhausted)
+            self._count(method, path, key_type, "rejected")
+            return retry_after
+        self._count(method, path, "all", "allowed")
+        return None
+
+    def _count(self, method: str, path: str, key_type: str, outcome: str) -> None:
+        with self._metrics_lock:
+            self.metrics[(f"{method} {path}", key_type, outcome)] += 1
+
+    def snapshot(self) -> dict:
+        with self._metrics_lock:
+            return dict(self.metrics)
+
+    def reset(self) -> None:
+        self.store.reset()
+        with self._metrics_lock:
+            self.metrics.clear()
+
+
+def authenticated_identity(scope) -> Optional[str]:
+    """The identity of a user an authentication middleware verified, or None.
+
+    Follows Starlette's ``scope["user"]`` convention. Anything the client sends, such as a
+    ``user_id`` in the body or a header, is not an identity.
+    """
+    user = scope.get("user")
+    if user is None or not getattr(user, "is_authenticated", False):
+        return None
+    return str(user.identity) or None
+
+
+class RateLimitMiddleware:
+    """ASGI middleware that answers 429 with Retry-After once a caller's bucket is empty.
+
+    Callers are identified by client IP and, once authenticated, by their user identity, so
+    one client cannot spend another user's tokens. It must run inside the authentication
+    middleware; requests without an authenticated user are limited by IP alone.
+    """
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in self.limiter.limits:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        retry_after = self.limiter.check(scope["method"], scope["path"], client[0] if client else None,
+                                         authenticated_identity(scope))
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Too many requests"},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, receive, send)
+
+
+rate_limiter = RateLimiter(parse_rate_limits(RATE_LIMITS))
@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import distinct, func, select, union_all
+from sqlalchemy.orm import Session
+
+from tdcs_dance_svc.models.appointment import Appointment, ArchivedAppointment
+
+
+def summarize_appointments(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None) -> dict:
+    """Count live and archived appointments starting in [start, end) with one aggregate query."""
+    selects = []
+    for model in (Appointment, ArchivedAppointment):
+        query = select(model.user_id, model.start_time, model.end_time)
+        if start is not None:
+            query = query.where(model.start_time >= start.astimezone(timezone.utc))
+        if end is not None:
+            query = query.where(model.start_time < end.astimezone(timezone.utc))
+        selects.append(query)
+    rows = union_all(*selects).subquery()
+    appointments, users, first_start, last_end = db.execute(select(
+        func.count(),
+        func.count(distinct(rows.c.user_id)),
+        func.min(rows.c.start_time),
+        func.max(rows.c.end_time),
+    )).one()
+    return {
+        "appointments": appointments,
+        "users": users,
+        "first_start": first_start,
+        "last_end": last_end,
+    }
@@ -1,26 +1,74 @@
 import os
+import json
+import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterator, Literal, Optional
 from zoneinfo import ZoneInfo
 
-import requests
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import insert, select, union_all
 from sqlalchemy.orm import Session
 
-from tdcs_dance_svc.models.base import get_db
-from tdcs_dance_svc.models.appointment import Appointment
+from tdcs_dance_svc.appointment_import import (
+    STATUS_IMPORTED,
+    ImportTooLarge,
+    import_appointments,
+    iter_csv_lines,
+    iter_spooled,
+    spool_upload,
+)
+from tdcs_dance_svc.caching import bump_schedule_version, schedule_etag
+from tdcs_dance_svc.config import (
+    EVENT_STREAM_HEARTBEAT_SECONDS,
+    HOLD_MAX_TTL_SECONDS,
+    HOLD_TTL_SECONDS,
+    IMPORT_MAX_BYTES,
+)
+from tdcs_dance_svc.events import APPOINTMENT_CREATED, broker, public_payload
+from tdcs_dance_svc.export import EXPORT_MEDIA_TYPES, stream_export
+from tdcs_dance_svc.holds import claim_hold, slot_taken
+from tdcs_dance_svc.loadshed import is_overload_error
+from tdcs_dance_svc.models.base import (
+    get_db,
+    get_read_db,
+    get_shard_db,
+    known_location,
+    mark_primary_sticky,
+    scatter_gather,
+    session_location,
+)
+from tdcs_dance_svc.models.appointment import Appointment, AppointmentHold, ArchivedAppointment
 from tdcs_dance_svc.notification import notify_instructor
+from tdcs_dance_svc.reporting import summarize_appointments
 from tdcs_dance_svc.email_reminder import schedule_email_reminder
 
 router = APIRouter()
 
+UTC = timezone.utc
+
+
+def __getattr__(name: str):
+    # ``requests`` is imported lazily; keep ``appointment.requests`` available to callers
+    if name == "requests":
+        import requests
+        return requests
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class AppointmentBookingRequest(BaseModel):
     user_id: int
     start_time: datetime
     end_time: datetime
     timezone: str
+    # Turn a hold from POST /appointments/hold into the appointment
+    hold_id: Optional[int] = None
+    # Language of the reminder email, e.g. "es-MX"; the default locale when omitted
+    locale: Optional[str] = None
 
 
 class AppointmentBookingResponse(BaseModel):
@@ -29,48 +77,189 @@ class AppointmentBookingResponse(BaseModel):
     end_time: datetime
 
 
+class AppointmentHoldRequest(BaseModel):
+    user_id: int
+    start_time: datetime
+    end_time: datetime
+    ttl_seconds: Optional[int] = Field(None, ge=1, le=HOLD_MAX_TTL_SECONDS)
+
+
+class AppointmentHoldResponse(BaseModel):
+    hold_id: int
+    start_time: datetime
+    end_time: datetime
+    expires_at: datetime
+
+
+class AppointmentResponse(BaseModel):
+    appointment_id: int
+    user_id: int
+    start_time: datetime
+    end_time: datetime
+    timezone: str
+
+
+class AvailabilityResponse(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    available: bool
+
+
+class ImportRowResult(BaseModel):
+    row: int
+    status: str
+    appointment_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ImportResponse(BaseModel):
+    imported: int
+    rejected: int
+    rows: list[ImportRowResult]
+
+
+class LocationReport(BaseModel):
+    location: str
+    appointments: int
+    users: int
+    first_start: Optional[datetime] = None
+    last_end: Optional[datetime] = None
+
+
+class AppointmentReport(BaseModel):
+    appointments: int
+    locations: list[LocationReport]
+
+
+def _to_response(appointment) -> AppointmentResponse:
+    return AppointmentResponse(
+        appointment_id=appointment.id,
+        user_id=appointment.user_id,
+        start_time=appointment.start_time,
+        end_time=appointment.end_time,
+        timezone=appointment.timezone
+    )
+
+
+def _server_error(e: Exception) -> HTTPException:
+    """503 with Retry-After when the database timed out or is saturated, 500 for anything else."""
+    if is_overload_error(e):
+        return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                             detail="Database is busy, try again shortly", headers={"Retry-After": "1"})
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
+
+def _slot_in_utc(start_time: datetime, end_time: datetime) -> tuple[datetime, datetime, datetime]:
+    """Validate a requested slot and return its start, end and the current time in UTC."""
+    start_time_utc = start_time.astimezone(UTC)
+    end_time_utc = end_time.astimezone(UTC)
+    now_utc = datetime.now(UTC)
+
+    if start_time_utc <= now_utc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Appointment must be set in the future")
+    if end_time_utc <= start_time_utc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="End time must be after start time")
+    return start_time_utc, end_time_utc, now_utc
+
+
+@router.post("/hold", response_model=AppointmentHoldResponse)
+
+def hold_appointment(request: AppointmentHoldRequest, db: Session = Depends(get_shard_db)):
+    """Claim a slot for ``ttl_seconds`` while the client checks out.
+
+    The hold blocks other bookings and holds for the slot until it expires or is booked
+    with ``hold_id``.
+    """
+    try:
+        start_time_utc, end_time_utc, now_utc = _slot_in_utc(request.start_time, request.end_time)
+        expires_at = now_utc + timedelta(seconds=request.ttl_seconds or HOLD_TTL_SECONDS)
+
+        # Lock the location's schedule before checking it, so concurrent holds and bookings
+        # for the location take turns; the slot frees up again at expires_at
+        bump_schedule_version(db, hold_expires_at=expires_at)
+        if slot_taken(db, start_time_utc, end_time_utc, now_utc):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Time slot conflict with an existing appointment")
+
+        hold_id = db.execute(
+            insert(AppointmentHold).values(
+                user_id=request.user_id,
+                start_time=start_time_utc,
+                end_time=end_time_utc,
+                expires_at=expires_at
+            ).returning(AppointmentHold.id)
+        ).scalar_one()
+        db.commit()
+
+        hold_response = JSONResponse(content={
+            "hold_id": hold_id,
+            "start_time": request.start_time.isoformat(),
+            "end_time": request.end_time.isoformat(),
+            "expires_at": expires_at.isoformat()
+        })
+        mark_primary_sticky(hold_response)
+        return hold_response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise _server_error(e)
+
+
 @router.post("/book", response_model=AppointmentBookingResponse)
 
-def book_appointment(request: AppointmentBookingRequest, db: Session = Depends(get_db)):
+def book_appointment(request: AppointmentBookingRequest, db: Session = Depends(get_shard_db)):
     try:
-        # Convert provided times to UTC using the provided timezone
+        # Validate the timezone the appointment will be stored with
         try:
-            local_tz = ZoneInfo(request.timezone)
+            ZoneInfo(request.timezone)
         except Exception as e:
             logging.error(e, exc_info=True)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid timezone provided")
 
-        start_time_utc = request.start_time.astimezone(ZoneInfo("UTC"))
-        end_time_utc = request.end_time.astimezone(ZoneInfo("UTC"))
-        now_utc = datetime.utcnow().replace(tzinfo=ZoneInfo("UTC"))
-
-        if start_time_utc <= now_utc:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Appointment must be set in the future")
-        if end_time_utc <= start_time_utc:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="End time must be after start time")
-
-        # Check for time slot conflicts
-        conflict = db.query(Appointment).filter(
-            Appointment.start_time < end_time_utc,
-            Appointment.end_time > start_time_utc
-        ).first()
-        if conflict:
+        start_time_utc, end_time_utc, now_utc = _slot_in_utc(request.start_time, request.end_time)
+
+        # Serialize with other writers for the location, as in hold_appointment
+        bump_schedule_version(db)
+
+        # Claim the caller's hold first so that it does not count as a conflict below
+        if request.hold_id is not None and not claim_hold(
+            db, request.hold_id, request.user_id, start_time_utc, end_time_utc, now_utc
+        ):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="Hold has expired or does not match this booking")
+
+        # Check for time slot conflicts with appointments and other users' active holds
+        if slot_taken(db, start_time_utc, end_time_utc, now_utc):
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Time slot conflict with an existing appointment")
 
-        # Create new appointment
+        # Create new appointment; RETURNING gives us the id without a refresh round trip
+        appointment_id = db.execute(
+            insert(Appointment).values(
+                user_id=request.user_id,
+                start_time=start_time_utc,
+                end_time=end_time_utc,
+                timezone=request.timezone
+            ).returning(Appointment.id)
+        ).scalar_one()
+        db.commit()
+
+        # Transient copy of what was stored, for the post-commit side effects
         new_appointment = Appointment(
+            id=appointment_id,
             user_id=request.user_id,
             start_time=start_time_utc,
             end_time=end_time_utc,
             timezone=request.timezone
         )
-        db.add(new_appointment)
-        db.commit()
-        db.refresh(new_appointment)
+
+        try:
+            broker.publish(APPOINTMENT_CREATED, new_appointment, session_location(db))
+        except Exception as e:
+            logging.error(e, exc_info=True)
 
         # Schedule email reminder without affecting booking confirmation
         try:
-            schedule_email_reminder(new_appointment)
+            schedule_email_reminder(new_appointment, request.locale)
         except Exception as e:
             logging.error(e, exc_info=True)
 
@@ -79,15 +268,20 @@ def book_appointment(request: AppointmentBookingRequest, db: Session = Depends(g
         except Exception as e:
             logging.error(e, exc_info=True)
 
-        appointment_response = AppointmentBookingResponse(
-            appointment_id=new_appointment.id,
-            start_time=new_appointment.start_time,
-            end_time=new_appointment.end_time
-        )
+        # The request was already validated, so serialize it directly instead of
+        # building and re-validating a response model
+        appointment_response = JSONResponse(content={
+            "appointment_id": appointment_id,
+            "start_time": request.start_time.isoformat(),
+            "end_time": request.end_time.isoformat()
+        })
+        mark_primary_sticky(appointment_response)
 
         # Optional calendar synchronization
         sync_flag = os.getenv("SYNC_CALENDAR", "False").lower() in ("true", "1", "yes")
         if sync_flag:
+            import requests
+
             try:
                 payload = {
                     "appointment_id": new_appointment.id,
@@ -106,4 +300,197 @@ def book_appointment(request: AppointmentBookingRequest, db: Session = Depends(g
         raise
     except Exception as e:
         logging.error(e, exc_info=True)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+        raise _server_error(e)
+
+
+async def _event_stream(request: Request, subscription):
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=EVENT_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                # The consumer fell behind; ask the client to reconnect and resync
+                yield "event: overflow\ndata: {}\n\n"
+                break
+            yield f"event: {event['type']}\ndata: {json.dumps(public_payload(event))}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/stream")
+
+async def stream_appointments(request: Request,
+                              user_id: Optional[int] = None,
+                              start: Optional[datetime] = None,
+                              end: Optional[datetime] = None,
+                              location: Optional[str] = None) -> StreamingResponse:
+    """Stream schedule changes as server-sent events, optionally filtered by user, date range and location.
+
+    Without configured shards every event belongs to one schedule and ``location`` is ignored.
+    """
+    try:
+        location = known_location(location)
+    except ValueError as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown location")
+    subscription = broker.subscribe(user_id=user_id,
+                                    start=start.astimezone(UTC) if start else None,
+                                    end=end.astimezone(UTC) if end else None,
+                                    location=location)
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _appointment_select(model, user_id: Optional[int], start: Optional[datetime], end: Optional[datetime]):
+    query = select(model.id, model.user_id, model.start_time, model.end_time, model.timezone)
+    if user_id is not None:
+        query = query.where(model.user_id == user_id)
+    if start is not None:
+        query = query.where(model.end_time > start.astimezone(UTC))
+    if end is not None:
+        query = query.where(model.start_time < end.astimezone(UTC))
+    return query
+
+
+@router.get("", response_model=list[AppointmentResponse], dependencies=[Depends(schedule_etag)])
+
+def list_appointments(user_id: Optional[int] = None,
+                      start: Optional[datetime] = None,
+                      end: Optional[datetime] = None,
+                      include_archived: bool = False,
+                      limit: int = Query(100, ge=1, le=1000),
+                      offset: int = Query(0, ge=0),
+                      db: Session = Depends(get_read_db)):
+    """List appointments ordered by start time, optionally filtered by user and overlapping range.
+
+    Finished appointments that were moved to the archive are only included when
+    ``include_archived`` is set, so the default listing only touches the hot table.
+    """
+    try:
+        query = _appointment_select(Appointment, user_id, start, end)
+        if include_archived:
+            query = union_all(query, _appointment_select(ArchivedAppointment, user_id, start, end))
+            columns = query.selected_columns
+            query = query.order_by(columns.start_time, columns.id)
+        else:
+            query = query.order_by(Appointment.start_time, Appointment.id)
+        rows = db.execute(query.offset(offset).limit(limit)).all()
+        return [_to_response(row) for row in rows]
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise _server_error(e)
+
+
+@router.get("/availability", response_model=AvailabilityResponse, dependencies=[Depends(schedule_etag)])
+
+def check_availability(start_time: datetime, end_time: datetime, db: Session = Depends(get_read_db)):
+    """Report whether a time slot is free, using the same overlap rule as booking, holds included."""
+    start_time_utc = start_time.astimezone(UTC)
+    end_time_utc = end_time.astimezone(UTC)
+    if end_time_utc <= start_time_utc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="End time must be after start time")
+    try:
+        taken = slot_taken(db, start_time_utc, end_time_utc, datetime.now(UTC))
+        return AvailabilityResponse(start_time=start_time, end_time=end_time, available=not taken)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise _server_error(e)
+
+
+def _pull_chunks(stream: AsyncIterator[bytes]) -> Iterator[bytes]:
+    # Runs on the import's worker thread; each chunk is received on the event loop on demand
+    while True:
+        try:
+            yield anyio.from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            return
+
+
+@router.post("/import", response_model=ImportResponse)
+
+async def import_appointments_csv(request: Request, notify: bool = False, db: Session = Depends(get_shard_db)):
+    """Bulk import appointments from a CSV request body.
+
+    The body is spooled to a temporary file rather than read into memory, and may be at most
+    ``IMPORT_MAX_BYTES``; a larger upload is rejected before any row is imported. Reminders and
+    instructor notifications are skipped unless ``notify`` is set, since imported bookings are
+    usually historical.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"CSV is larger than {IMPORT_MAX_BYTES} bytes")
+    try:
+        # Chunked uploads carry no Content-Length, so their size is only known once spooled
+        upload = await run_in_threadpool(spool_upload, _pull_chunks(request.stream()), IMPORT_MAX_BYTES)
+    except ImportTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    try:
+        with upload:
+            lines = iter_csv_lines(iter_spooled(upload))
+            results = await run_in_threadpool(import_appointments, db, lines, notify=notify)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV must be UTF-8 encoded")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise _server_error(e)
+    imported = sum(1 for result in results if result["status"] == STATUS_IMPORTED)
+    return ImportResponse(imported=imported, rejected=len(results) - imported, rows=results)
+
+
+@router.get("/export")
+
+def export_appointments(request: Request,
+                        format: Literal["csv", "ndjson"] = "csv",
+                        from_: Optional[datetime] = Query(None, alias="from"),
+                        to: Optional[datetime] = None,
+                        db: Session = Depends(get_read_db)) -> StreamingResponse:
+    """Stream appointments starting in [from, to) as CSV or NDJSON, in each appointment's timezone."""
+    compress = "gzip" in request.headers.get("accept-encoding", "").lower()
+    headers = {"Content-Disposition": f'attachment; filename="appointments.{format}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(
+        stream_export(db, format, from_, to, compress=compress),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers
+    )
+
+
+@router.get("/report", response_model=AppointmentReport)
+
+def appointment_report(from_: Optional[datetime] = Query(None, alias="from"),
+                       to: Optional[datetime] = None,
+                       db: Session = Depends(get_db)):
+    """Summarize appointments starting in [from, to) per location, querying all shards in parallel."""
+    try:
+        summaries = scatter_gather(lambda session: summarize_appointments(session, from_, to), db)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise _server_error(e)
+    locations = [LocationReport(location=location, **summary) for location, summary in summaries.items()]
+    return AppointmentReport(appointments=sum(report.appointments for report in locations), locations=locations)
+
+
+@router.get("/{appointment_id}", response_model=AppointmentResponse, dependencies=[Depends(schedule_etag)])
+
+def get_appointment(appointment_id: int, db: Session = Depends(get_read_db)):
+    try:
+        appointment = db.get(Appointment, appointment_id) or db.get(ArchivedAppointment, appointment_id)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise _server_error(e)
+    if appointment is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appointment not found")
+    return _to_response(appointment)
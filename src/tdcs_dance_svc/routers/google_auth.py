@@ -1,7 +1,6 @@
 import os
 import secrets
 import logging
-import requests
 from urllib.parse import urlencode
 
 from fastapi import APIRouter, Request, HTTPException, status
@@ -79,6 +78,9 @@ def callback(request: Request) -> dict:
             "grant_type": "authorization_code"
         }
 
+        # Imported here so the HTTP client is only loaded once OAuth is actually used
+        import requests
+
         token_response = None
         # Attempt token exchange with at most one retry for transient failures
         for attempt in range(2):
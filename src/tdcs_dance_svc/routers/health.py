@@ -0,0 +1,76 @@
+import secrets
+from ipaddress import ip_address
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
+
+from tdcs_dance_svc.config import DEBUG_ENDPOINTS, DEBUG_TOKEN
+from tdcs_dance_svc.health import check_databases, runtime_snapshot
+from tdcs_dance_svc.loadshed import concurrency_limiter
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+
+def healthz() -> dict:
+    """Liveness probe: the process is up and serving requests. Touches no dependencies."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+
+async def readyz() -> JSONResponse:
+    """Readiness probe: 503 while shedding load, or when a database is unreachable or not migrated."""
+    overloaded = concurrency_limiter.overloaded()
+    databases = await check_databases()
+    ready = not overloaded and all(result["ok"] for result in databases.values())
+    if overloaded:
+        state = "overloaded"
+    elif not ready:
+        state = "degraded"
+    else:
+        state = "ready"
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": state,
+            "databases": databases,
+            "concurrency": concurrency_limiter.snapshot(),
+        }
+    )
+
+
+def _is_loopback(host: Optional[str]) -> bool:
+    try:
+        return host is not None and ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def require_debug_access(request: Request, x_debug_token: Optional[str] = Header(None)) -> None:
+    """Gate for debug endpoints: 404 unless ``DEBUG_ENDPOINTS`` is set.
+
+    When enabled they serve callers on the loopback interface, or callers that send the
+    configured ``DEBUG_TOKEN`` as ``X-Debug-Token``; anyone else gets a 403.
+    """
+    if not DEBUG_ENDPOINTS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if _is_loopback(request.client.host if request.client else None):
+        return
+    if DEBUG_TOKEN and x_debug_token and secrets.compare_digest(x_debug_token, DEBUG_TOKEN):
+        return
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Debug endpoints require a debug token")
+
+
+@router.get("/debug/runtime", dependencies=[Depends(require_debug_access)])
+
+async def debug_runtime(tracemalloc: Optional[Literal["start", "stop"]] = None,
+                        top: int = Query(0, ge=0, le=100)) -> dict:
+    """Pool, thread, event loop, GC and event queue state of this worker.
+
+    ``tracemalloc=start`` begins tracing allocations and ``top=N`` lists the N largest
+    allocation sites while tracing; ``tracemalloc=stop`` turns tracing off again.
+    """
+    return await runtime_snapshot(tracemalloc, top)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from tdcs_dance_svc.loadshed import concurrency_limiter
+from tdcs_dance_svc.ratelimit import rate_limiter
+
+router = APIRouter()
+
+
+def _labels(**labels: str) -> str:
+    escaped = (f'{key}="{value}"'.replace("\n", " ") for key, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+
+def metrics() -> str:
+    """Expose service counters in the Prometheus text format."""
+    lines = [
+        "# HELP tdcs_rate_limit_requests_total Requests checked by the rate limiter.",
+        "# TYPE tdcs_rate_limit_requests_total counter",
+    ]
+    for (route, key_type, outcome), count in sorted(rate_limiter.snapshot().items()):
+        lines.append(f"tdcs_rate_limit_requests_total{_labels(route=route, key=key_type, outcome=outcome)} {count}")
+    concurrency = concurrency_limiter.snapshot()
+    lines.extend([
+        "# HELP tdcs_concurrency_limit Current adaptive limit on in-flight database-bound requests.",
+        "# TYPE tdcs_concurrency_limit gauge",
+        f"tdcs_concurrency_limit {concurrency['limit']}",
+        "# HELP tdcs_concurrency_in_flight Database-bound requests currently being served.",
+        "# TYPE tdcs_concurrency_in_flight gauge",
+        f"tdcs_concurrency_in_flight {concurrency['in_flight']}",
+        "# HELP tdcs_requests_shed_total Requests rejected with 503 by the concurrency limiter.",
+        "# TYPE tdcs_requests_shed_total counter",
+        f"tdcs_requests_shed_total {concurrency['shed_total']}",
+    ])
+    return "\n".join(lines) + "\n"
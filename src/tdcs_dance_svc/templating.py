@@ -0,0 +1,174 @@
+import html
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from string import Template
+from threading import Lock
+from typing import Any, Iterable, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+from tdcs_dance_svc.config import DEFAULT_LOCALE, TEMPLATE_DIR, TEMPLATE_RELOAD_SECONDS
+
+# Date and time patterns per locale. They are filled in explicitly rather than with strftime,
+# whose %p and %Z follow the process locale and platform instead of the recipient's
+DATETIME_FORMATS = {
+    "en": "{year:04d}-{month:02d}-{day:02d} {hour12:02d}:{minute:02d} {period} {zone}",
+    "es": "{day:02d}/{month:02d}/{year:04d} {hour:02d}:{minute:02d} {zone}",
+    "ko": "{year:04d}년 {month:02d}월 {day:02d}일 {hour:02d}:{minute:02d} {zone}",
+}
+# Morning and afternoon markers for the 12-hour patterns
+DAY_PERIODS = {
+    "en": ("AM", "PM"),
+}
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    text: str
+    html: Optional[str]
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str):
+    try:
+        return ZoneInfo(name)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        return timezone.utc
+
+
+class TemplateCache:
+    """Compiled templates, loaded from disk once per process.
+
+    Templates live at ``<directory>/<locale>/<name>.<kind>`` where kind is ``subject``, ``txt``
+    or ``html``. A locale such as ``es-MX`` falls back to ``es`` and then to the default
+    locale. When ``reload_seconds`` is positive, a cached template is re-read if its file
+    changed, checking the file at most once per interval, so edits apply without a restart.
+    """
+
+    def __init__(self, directory: str = TEMPLATE_DIR, default_locale: str = DEFAULT_LOCALE,
+                 reload_seconds: float = TEMPLATE_RELOAD_SECONDS):
+        self.directory = directory
+        self.default_locale = default_locale
+        self.reload_seconds = reload_seconds
+        self._templates: dict[tuple[str, str, str], tuple[Optional[Template], float, float]] = {}
+        self._lock = Lock()
+
+    def candidates(self, locale: Optional[str]) -> list[str]:
+        locales = []
+        if locale:
+            locale = locale.replace("_", "-")
+            locales.append(locale)
+            if "-" in locale:
+                locales.append(locale.split("-", 1)[0])
+        locales.append(self.default_locale)
+        return list(dict.fromkeys(locales))
+
+    def get(self, name: str, kind: str, locale: Optional[str] = None) -> Optional[Template]:
+        for candidate in self.candidates(locale):
+            template = self._load(candidate, name, kind)
+            if template is not None:
+                return template
+        return None
+
+    def _load(self, locale: str, name: str, kind: str) -> Optional[Template]:
+        key = (locale, name, kind)
+        cached = self._templates.get(key)
+        now = time.monotonic()
+        if cached is not None and (self.reload_seconds <= 0 or now - cached[2] < self.reload_seconds):
+            return cached[0]
+
+        path = os.path.join(self.directory, locale, f"{name}.{kind}")
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = -1.0
+        with self._lock:
+            if cached is not None and cached[1] == mtime:
+                template = cached[0]
+            elif mtime < 0:
+                template = None
+            else:
+                with open(path, encoding="utf-8") as source:
+                    template = Template(source.read())
+            self._templates[key] = (template, mtime, now)
+        return template
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+
+template_cache = TemplateCache()
+
+
+def reload_templates() -> None:
+    """Drop every compiled template so the next render reads the files again."""
+    template_cache.clear()
+
+
+def format_local(value: datetime, zone_name: str, locale: Optional[str] = None) -> str:
+    """Format ``value`` in ``zone_name`` for ``locale``, labelled with the zone's name."""
+    language = next((candidate for candidate in template_cache.candidates(locale)
+                     if candidate in DATETIME_FORMATS), "en")
+    zone = _zone(zone_name)
+    local = value.astimezone(zone)
+    periods = DAY_PERIODS.get(language, DAY_PERIODS["en"])
+    return DATETIME_FORMATS[language].format(
+        year=local.year, month=local.month, day=local.day,
+        hour=local.hour, hour12=local.hour % 12 or 12, minute=local.minute,
+        period=periods[local.hour >= 12],
+        zone=zone_name if zone is not timezone.utc else "UTC"
+    )
+
+
+def appointment_context(appointment: Any, locale: Optional[str] = None) -> dict:
+    zone_name = getattr(appointment, "timezone", None) or "UTC"
+    end_time = getattr(appointment, "end_time", None)
+    return {
+        "appointment_id": appointment.id,
+        "user_id": getattr(appointment, "user_id", ""),
+        "timezone": zone_name,
+        "start_local": format_local(appointment.start_time, zone_name, locale),
+        "end_local": format_local(end_time, zone_name, locale) if end_time else "",
+    }
+
+
+def _templates_for(name: str, locale: Optional[str]) -> tuple:
+    text = template_cache.get(name, "txt", locale)
+    if text is None:
+        raise LookupError(f"No text template named {name!r}")
+    return template_cache.get(name, "subject", locale), text, template_cache.get(name, "html", locale)
+
+
+def _substitute(templates: tuple, context: dict) -> RenderedEmail:
+    subject, text, html_template = templates
+    html_body = None
+    if html_template is not None:
+        html_body = html_template.safe_substitute({key: html.escape(str(value)) for key, value in context.items()})
+    return RenderedEmail(
+        subject=subject.safe_substitute(context).strip() if subject else "",
+        text=text.safe_substitute(context).strip(),
+        html=html_body
+    )
+
+
+def render(name: str, context: dict, locale: Optional[str] = None) -> RenderedEmail:
+    return _substitute(_templates_for(name, locale), context)
+
+
+def render_reminder(appointment: Any, locale: Optional[str] = None) -> RenderedEmail:
+    return render("reminder", appointment_context(appointment, locale), locale)
+
+
+def render_reminders(reminders: Iterable[tuple[Any, Optional[str]]]) -> list[RenderedEmail]:
+    """Render reminders for ``(appointment, locale)`` pairs, looking the templates up once per locale."""
+    templates_by_locale = {}
+    rendered = []
+    for appointment, locale in reminders:
+        if locale not in templates_by_locale:
+            templates_by_locale[locale] = _templates_for("reminder", locale)
+        rendered.append(_substitute(templates_by_locale[locale], appointment_context(appointment, locale)))
+    return rendered
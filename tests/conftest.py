@@ -39,4 +39,18 @@ def client(session_local):
     with TestClient(app) as c:
         yield c
     app.dependency_overrides[get_db] = get_db
-# DO NOT MODIFY SECTION END
\ No newline at end of file
+# DO NOT MODIFY SECTION END
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter():
+    from tdcs_dance_svc.ratelimit import rate_limiter
+    rate_limiter.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_concurrency_limiter():
+    from tdcs_dance_svc.loadshed import concurrency_limiter
+    concurrency_limiter.reset()
+    yield
+    concurrency_limiter.reset()
@@ -32,6 +32,20 @@ def test_valid_booking(client, db_session):
     assert data["end_time"] == payload["end_time"]
 
 
+def test_booked_times_read_back_with_utc_offset(client):
+    future_start = get_future_time(25).replace(microsecond=0)
+    payload = {
+        "user_id": 1,
+        "start_time": future_start.isoformat(),
+        "end_time": (future_start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    }
+    appointment_id = client.post("/appointments/book", json=payload).json()["appointment_id"]
+
+    data = client.get(f"/appointments/{appointment_id}").json()
+    assert datetime.fromisoformat(data["start_time"]) == future_start.replace(tzinfo=ZoneInfo("UTC"))
+
+
 def test_conflict_booking(client, db_session):
     future_start = get_future_time(30)
     future_end = future_start + timedelta(hours=1)
@@ -15,7 +15,7 @@ def test_email_reminder_failure(monkeypatch, client, caplog):
     caplog.set_level(logging.ERROR)
     
     # Monkey-patch schedule_email_reminder in the appointment router to simulate a failure
-    def fake_schedule_email(appointment):
+    def fake_schedule_email(appointment, locale=None):
         raise Exception("Simulated email scheduling failure")
     monkeypatch.setattr("tdcs_dance_svc.routers.appointment.schedule_email_reminder", fake_schedule_email)
     
@@ -34,3 +34,22 @@ def test_email_reminder_failure(monkeypatch, client, caplog):
     
     # Check that the error from scheduling is logged
     assert any("Simulated email scheduling failure" in record.message for record in caplog.records)
+
+
+def test_reminder_uses_the_booking_locale(monkeypatch, client):
+    sent = []
+    monkeypatch.setattr("tdcs_dance_svc.email_reminder.schedule_email", lambda content, when: sent.append(content) or True)
+
+    future_start = get_future_time(120)
+    payload = {
+        "user_id": 11,
+        "start_time": future_start.isoformat(),
+        "end_time": (future_start + timedelta(hours=1)).isoformat(),
+        "timezone": "Europe/Madrid",
+        "locale": "es-MX"
+    }
+    response = client.post("/appointments/book", json=payload)
+
+    assert response.status_code == 200
+    assert sent[0].text.startswith("Recordatorio")
+    assert "Europe/Madrid" in sent[0].text
@@ -0,0 +1,154 @@
+import io
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+import pytest
+
+from tdcs_dance_svc.appointment_import import ImportTooLarge, import_appointments, iter_csv_lines, spool_upload
+from tdcs_dance_svc.models.appointment import Appointment
+
+HEADER = "user_id,start_time,end_time,timezone\n"
+
+
+def test_import_reports_each_row(db_session):
+    csv_text = HEADER + "\n".join([
+        "1,2030-03-01T10:00:00,2030-03-01T11:00:00,Europe/Paris",
+        "2,2030-03-01T10:30:00,2030-03-01T11:30:00,Europe/Paris",
+        "3,2030-03-02T10:00:00,2030-03-02T09:00:00,UTC",
+        "4,2030-03-03T10:00:00,2030-03-03T11:00:00,Mars/Olympus",
+        "x,2030-03-04T10:00:00,2030-03-04T11:00:00,UTC",
+        "6,2020-01-01T10:00:00,2020-01-01T11:00:00,UTC",
+    ]) + "\n"
+
+    results = import_appointments(db_session, io.StringIO(csv_text), batch_size=4)
+
+    assert [r["row"] for r in results] == [1, 2, 3, 4, 5, 6]
+    assert [r["status"] for r in results] == ["imported", "conflict", "invalid", "invalid", "invalid", "imported"]
+    assert "row 1" in results[1]["error"]
+
+    stored = db_session.get(Appointment, results[0]["appointment_id"])
+    # Naive times are local to the row's timezone, stored in UTC and read back aware
+    assert stored.start_time == datetime(2030, 3, 1, 9, 0, tzinfo=timezone.utc)
+    assert db_session.query(Appointment).count() == 2
+
+
+def test_import_detects_conflicts_with_existing_and_earlier_batches(db_session):
+    db_session.add(Appointment(user_id=9, start_time=datetime(2030, 5, 1, 12, 0),
+                               end_time=datetime(2030, 5, 1, 14, 0), timezone="UTC"))
+    db_session.commit()
+    csv_text = HEADER + "\n".join([
+        "1,2030-05-01T13:00:00,2030-05-01T15:00:00,UTC",
+        "2,2030-05-02T09:00:00,2030-05-02T10:00:00,UTC",
+        "3,2030-05-02T09:30:00,2030-05-02T10:30:00,UTC",
+    ]) + "\n"
+
+    results = import_appointments(db_session, io.StringIO(csv_text), batch_size=2)
+
+    assert [r["status"] for r in results] == ["conflict", "imported", "conflict"]
+
+
+def test_import_rejects_missing_columns(db_session):
+    with pytest.raises(ValueError):
+        import_appointments(db_session, io.StringIO("user_id,start_time\n1,2030-01-01T10:00:00\n"))
+
+
+def test_import_endpoint_skips_side_effects_by_default(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr("tdcs_dance_svc.appointment_import.notify_instructor", lambda a: calls.append(a))
+    monkeypatch.setattr("tdcs_dance_svc.appointment_import.schedule_email_reminder", lambda a, locale=None: calls.append(a))
+    start = datetime.utcnow() + timedelta(days=3)
+    csv_text = HEADER + f"1,{start.isoformat()},{(start + timedelta(hours=1)).isoformat()},UTC\n"
+
+    response = client.post("/appointments/import", content=csv_text, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1
+    assert calls == []
+
+    # The imported slot now conflicts with a regular booking
+    booking = client.post("/appointments/book", json={
+        "user_id": 2,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    })
+    assert booking.status_code == 409
+
+
+def test_import_endpoint_runs_side_effects_when_asked(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr("tdcs_dance_svc.appointment_import.notify_instructor", lambda a: calls.append(a.id))
+    monkeypatch.setattr("tdcs_dance_svc.appointment_import.schedule_email_reminder", lambda a, locale=None: None)
+    csv_text = HEADER + "1,2030-06-01T10:00:00,2030-06-01T11:00:00,UTC\n"
+
+    response = client.post("/appointments/import", params={"notify": True}, content=csv_text)
+    assert response.status_code == 200
+    assert calls == [response.json()["rows"][0]["appointment_id"]]
+
+
+def test_import_endpoint_bad_header(client):
+    response = client.post("/appointments/import", content="foo,bar\n1,2\n")
+    assert response.status_code == 400
+
+
+def test_csv_lines_are_decoded_across_chunk_boundaries():
+    data = ("﻿" + HEADER + "1,2030-06-01T10:00:00,2030-06-01T11:00:00,Asia/Seoul\r\n2,é,x,UTC").encode("utf-8")
+    chunks = [data[i:i + 3] for i in range(0, len(data), 3)]
+
+    lines = list(iter_csv_lines(chunks))
+
+    assert lines[0] == HEADER
+    assert lines[1] == "1,2030-06-01T10:00:00,2030-06-01T11:00:00,Asia/Seoul\r\n"
+    assert lines[2] == "2,é,x,UTC"
+
+
+def test_spooling_enforces_the_size_limit():
+    with pytest.raises(ImportTooLarge):
+        spool_upload([b"a" * 10, b"b" * 10], max_bytes=15)
+
+    with spool_upload([b"a" * 10, b"b" * 5], max_bytes=15) as spool:
+        assert spool.read() == b"a" * 10 + b"b" * 5
+
+
+def test_import_endpoint_rejects_oversized_uploads(client, monkeypatch):
+    monkeypatch.setattr("tdcs_dance_svc.routers.appointment.IMPORT_MAX_BYTES", 64)
+    csv_text = HEADER + "1,2030-06-01T10:00:00,2030-06-01T11:00:00,UTC\n" * 3
+
+    response = client.post("/appointments/import", content=csv_text)
+    assert response.status_code == 413
+
+    chunked = client.post("/appointments/import", content=iter([csv_text.encode("utf-8")]))
+    assert chunked.status_code == 413
+
+
+def test_oversized_chunked_upload_imports_nothing(client, db_session, monkeypatch):
+    monkeypatch.setattr("tdcs_dance_svc.routers.appointment.IMPORT_MAX_BYTES", 128)
+    # One row per batch, so a streaming importer would have committed the first rows already
+    monkeypatch.setattr("tdcs_dance_svc.routers.appointment.import_appointments",
+                        partial(import_appointments, batch_size=1))
+    rows = [f"{i},2030-06-0{i}T10:00:00,2030-06-0{i}T11:00:00,UTC\n" for i in range(1, 5)]
+    chunks = [HEADER.encode("utf-8")] + [row.encode("utf-8") for row in rows]
+
+    response = client.post("/appointments/import", content=iter(chunks))
+
+    assert response.status_code == 413
+    assert db_session.query(Appointment).count() == 0
+
+
+def test_import_endpoint_rejects_non_utf8(client):
+    response = client.post("/appointments/import", content=HEADER.encode("utf-8") + b"\xff\xfe\n")
+    assert response.status_code == 400
+
+
+def test_import_respects_active_holds(client, db_session):
+    start = datetime.utcnow() + timedelta(days=3)
+    hold = client.post("/appointments/hold", json={
+        "user_id": 1,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat()
+    })
+    assert hold.status_code == 200
+    csv_text = HEADER + f"2,{start.isoformat()},{(start + timedelta(hours=1)).isoformat()},UTC\n"
+
+    results = import_appointments(db_session, io.StringIO(csv_text))
+
+    assert [r["status"] for r in results] == ["conflict"]
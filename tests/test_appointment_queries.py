@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+
+def get_future_time(minutes=10):
+    return datetime.utcnow() + timedelta(minutes=minutes)
+
+
+def book(client, user_id, start, hours=1):
+    payload = {
+        "user_id": user_id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=hours)).isoformat(),
+        "timezone": "UTC"
+    }
+    response = client.post("/appointments/book", json=payload)
+    assert response.status_code == 200
+    return response.json()["appointment_id"]
+
+
+def test_lookup_appointment(client):
+    start = get_future_time(20)
+    appointment_id = book(client, 7, start)
+
+    response = client.get(f"/appointments/{appointment_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["appointment_id"] == appointment_id
+    assert data["user_id"] == 7
+    assert data["timezone"] == "UTC"
+
+
+def test_lookup_missing_appointment(client):
+    response = client.get("/appointments/9999")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_list_appointments_filters(client):
+    first = get_future_time(60)
+    book(client, 1, first)
+    book(client, 2, first + timedelta(hours=2))
+    book(client, 1, first + timedelta(days=2))
+
+    response = client.get("/appointments", params={"user_id": 1})
+    assert response.status_code == 200
+    assert [a["user_id"] for a in response.json()] == [1, 1]
+
+    response = client.get("/appointments", params={
+        "start": first.isoformat(),
+        "end": (first + timedelta(hours=4)).isoformat()
+    })
+    assert [a["user_id"] for a in response.json()] == [1, 2]
+
+
+def test_availability(client):
+    start = get_future_time(90)
+    book(client, 1, start)
+
+    busy = client.get("/appointments/availability", params={
+        "start_time": (start + timedelta(minutes=30)).isoformat(),
+        "end_time": (start + timedelta(minutes=90)).isoformat()
+    })
+    assert busy.status_code == 200
+    assert busy.json()["available"] is False
+
+    free = client.get("/appointments/availability", params={
+        "start_time": (start + timedelta(hours=1)).isoformat(),
+        "end_time": (start + timedelta(hours=2)).isoformat()
+    })
+    assert free.json()["available"] is True
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from tdcs_dance_svc.archive import archive_cutoff, archive_past_appointments
+from tdcs_dance_svc.models.appointment import Appointment, ArchivedAppointment
+
+
+def add_appointment(db_session, user_id, start, hours=1):
+    appointment = Appointment(user_id=user_id, start_time=start,
+                              end_time=start + timedelta(hours=hours), timezone="UTC")
+    db_session.add(appointment)
+    db_session.commit()
+    return appointment.id
+
+
+def test_archive_moves_only_finished_appointments(db_session):
+    now = datetime.utcnow()
+    old_ids = [add_appointment(db_session, 1, now - timedelta(days=30 + i)) for i in range(5)]
+    future_id = add_appointment(db_session, 1, now + timedelta(days=1))
+
+    moved = archive_past_appointments(db_session, archive_cutoff(now, days=7), batch_size=2)
+
+    assert moved == 5
+    assert [a.id for a in db_session.query(Appointment).all()] == [future_id]
+    assert sorted(a.id for a in db_session.query(ArchivedAppointment).all()) == sorted(old_ids)
+
+
+def test_archive_is_idempotent(db_session):
+    now = datetime.utcnow()
+    add_appointment(db_session, 1, now - timedelta(days=30))
+    cutoff = archive_cutoff(now, days=7)
+
+    assert archive_past_appointments(db_session, cutoff) == 1
+    assert archive_past_appointments(db_session, cutoff) == 0
+
+
+def test_archived_appointments_stay_readable(client, db_session):
+    now = datetime.utcnow()
+    archived_id = add_appointment(db_session, 5, now - timedelta(days=30))
+    live_id = add_appointment(db_session, 5, now + timedelta(days=1))
+    archive_past_appointments(db_session, archive_cutoff(now, days=7))
+
+    default = client.get("/appointments", params={"user_id": 5})
+    assert [a["appointment_id"] for a in default.json()] == [live_id]
+
+    everything = client.get("/appointments", params={"user_id": 5, "include_archived": True})
+    assert everything.status_code == 200
+    assert [a["appointment_id"] for a in everything.json()] == [archived_id, live_id]
+
+    lookup = client.get(f"/appointments/{archived_id}")
+    assert lookup.status_code == 200
+    assert lookup.json()["user_id"] == 5
+
+
+def test_archived_ids_are_not_reused(client, db_session):
+    now = datetime.utcnow()
+    add_appointment(db_session, 1, now - timedelta(days=31))
+    newest_id = add_appointment(db_session, 1, now - timedelta(days=30))
+    assert archive_past_appointments(db_session, archive_cutoff(now, days=7)) == 2
+
+    # The highest id was archived; a new appointment must not get it again
+    reused_id = add_appointment(db_session, 2, now - timedelta(days=29))
+    assert reused_id > newest_id
+    assert archive_past_appointments(db_session, archive_cutoff(now, days=7)) == 1
+
+    archived = client.get(f"/appointments/{newest_id}")
+    assert archived.status_code == 200
+    assert archived.json()["user_id"] == 1
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from tdcs_dance_svc.caching import bump_schedule_version, schedule_version
+from tdcs_dance_svc.models.appointment import AppointmentHold, ScheduleVersion
+from tdcs_dance_svc.profiling import query_profiler
+
+
+def book(client, start, user_id=1):
+    return client.post("/appointments/book", json={
+        "user_id": user_id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    })
+
+
+def test_reads_return_etags_and_answer_304(client):
+    start = datetime.utcnow() + timedelta(days=1)
+    appointment_id = book(client, start).json()["appointment_id"]
+
+    for path in ("/appointments", f"/appointments/{appointment_id}"):
+        first = client.get(path)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+
+        again = client.get(path, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["etag"] == etag
+        assert again.content == b""
+
+
+def test_booking_changes_the_etag(client):
+    start = datetime.utcnow() + timedelta(days=1)
+    etag = client.get("/appointments").headers["etag"]
+
+    book(client, start)
+
+    response = client.get("/appointments", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()) == 1
+
+
+def test_not_modified_runs_only_the_version_lookup(client):
+    etag = client.get("/appointments").headers["etag"]
+    query_profiler.enable()
+    try:
+        response = client.get("/appointments", headers={"If-None-Match": f'W/"other", {etag}'})
+    finally:
+        query_profiler.disable()
+    assert response.status_code == 304
+    assert response.headers["x-db-statements"] == "1"
+
+
+def test_workers_share_the_schedule_version(session_local):
+    # Separate sessions stand in for separate worker processes on one database
+    writer, reader = session_local(), session_local()
+    try:
+        assert schedule_version(reader, reader) == 0
+        bump_schedule_version(writer)
+        writer.commit()
+        assert schedule_version(reader, reader) == 1
+        assert schedule_version(writer, writer) == 1
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_hold_expiry_changes_the_etag(client, session_local):
+    start = datetime.utcnow() + timedelta(days=1)
+    hold = client.post("/appointments/hold", json={
+        "user_id": 1,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "ttl_seconds": 60
+    })
+    assert hold.status_code == 200
+    slot = {"start_time": start.isoformat() + "+00:00", "end_time": (start + timedelta(hours=1)).isoformat() + "+00:00"}
+    first = client.get("/appointments/availability", params=slot)
+    assert first.json()["available"] is False
+    etag = first.headers["etag"]
+    assert client.get("/appointments/availability", params=slot, headers={"If-None-Match": etag}).status_code == 304
+
+    # Let the hold run out without any write to the schedule
+    expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+    with session_local() as db:
+        db.execute(update(AppointmentHold).values(expires_at=expired))
+        db.execute(update(ScheduleVersion).values(next_expiry=expired))
+        db.commit()
+    response = client.get("/appointments/availability", params=slot, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["available"] is True
+    assert response.headers["etag"] != etag
+    # The version moved once; later reads match again
+    assert client.get("/appointments/availability", params=slot,
+                      headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_large_responses_are_gzipped(client):
+    start = datetime.utcnow() + timedelta(days=1)
+    for i in range(20):
+        book(client, start + timedelta(hours=2 * i), user_id=i)
+
+    response = client.get("/appointments", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 20
+
+    small = client.get("/appointments", params={"limit": 1}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    # One weak ETag covers the gzipped and the plain representation
+    assert response.headers["etag"] == small.headers["etag"]
+    assert response.headers["etag"].startswith('W/"')
+
+
+def test_export_is_not_compressed_twice(client):
+    start = datetime.utcnow() + timedelta(days=1)
+    for i in range(20):
+        book(client, start + timedelta(hours=2 * i), user_id=i)
+
+    response = client.get("/appointments/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    # httpx already removed our single layer of gzip
+    assert response.text.startswith("appointment_id,")
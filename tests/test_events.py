@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from tdcs_dance_svc.events import APPOINTMENT_CREATED, EventBroker, broker
+from tdcs_dance_svc.models.base import DEFAULT_LOCATION
+
+
+class FakeAppointment:
+    def __init__(self, id, user_id, start_time, end_time, timezone="UTC"):
+        self.id = id
+        self.user_id = user_id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.timezone = timezone
+
+
+def make_appointment(id=1, user_id=1, hours_ahead=1):
+    start = datetime.now(ZoneInfo("UTC")) + timedelta(hours=hours_ahead)
+    return FakeAppointment(id, user_id, start, start + timedelta(hours=1))
+
+
+def test_publish_delivers_to_matching_subscribers():
+    async def scenario():
+        event_broker = EventBroker(max_queue_size=10)
+        everyone = event_broker.subscribe()
+        only_user_2 = event_broker.subscribe(user_id=2)
+
+        event_broker.publish(APPOINTMENT_CREATED, make_appointment(id=1, user_id=1))
+        event = await asyncio.wait_for(everyone.queue.get(), timeout=1)
+        assert event["type"] == APPOINTMENT_CREATED
+        assert event["appointment_id"] == 1
+        assert only_user_2.queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_date_range_filter():
+    async def scenario():
+        event_broker = EventBroker(max_queue_size=10)
+        now = datetime.now(ZoneInfo("UTC"))
+        subscription = event_broker.subscribe(start=now, end=now + timedelta(hours=3))
+
+        event_broker.publish(APPOINTMENT_CREATED, make_appointment(id=1, hours_ahead=48))
+        event_broker.publish(APPOINTMENT_CREATED, make_appointment(id=2, hours_ahead=1))
+        event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+        assert event["appointment_id"] == 2
+        assert subscription.queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_location_filter():
+    async def scenario():
+        event_broker = EventBroker(max_queue_size=10)
+        subscription = event_broker.subscribe(location="uptown")
+
+        event_broker.publish(APPOINTMENT_CREATED, make_appointment(id=1), "downtown")
+        event_broker.publish(APPOINTMENT_CREATED, make_appointment(id=2), "uptown")
+        event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+        assert event["appointment_id"] == 2
+        assert event["location"] == "uptown"
+        assert subscription.queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_is_cut_off():
+    async def scenario():
+        event_broker = EventBroker(max_queue_size=2)
+        subscription = event_broker.subscribe()
+        for i in range(5):
+            event_broker.publish(APPOINTMENT_CREATED, make_appointment(id=i))
+        await asyncio.sleep(0)
+        assert subscription.overflowed is True
+        assert await subscription.queue.get() is None
+
+    asyncio.run(scenario())
+
+
+def test_booking_publishes_created_event(client):
+    async def scenario():
+        subscription = broker.subscribe(user_id=42)
+        try:
+            start = datetime.utcnow() + timedelta(minutes=20)
+            payload = {
+                "user_id": 42,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(),
+                "timezone": "UTC"
+            }
+            response = await asyncio.to_thread(client.post, "/appointments/book", json=payload)
+            assert response.status_code == 200
+            event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+            assert event["type"] == APPOINTMENT_CREATED
+            assert event["appointment_id"] == response.json()["appointment_id"]
+            assert event["location"] == DEFAULT_LOCATION
+        finally:
+            broker.unsubscribe(subscription)
+
+    asyncio.run(scenario())
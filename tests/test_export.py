@@ -0,0 +1,67 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from tdcs_dance_svc.archive import archive_cutoff, archive_past_appointments
+from tdcs_dance_svc.export import stream_export
+from tdcs_dance_svc.models.appointment import Appointment
+
+
+def add_appointment(db_session, user_id, start, timezone="UTC"):
+    appointment = Appointment(user_id=user_id, start_time=start,
+                              end_time=start + timedelta(hours=1), timezone=timezone)
+    db_session.add(appointment)
+    db_session.commit()
+    return appointment.id
+
+
+def test_export_csv_converts_to_stored_timezone(client, db_session):
+    add_appointment(db_session, 1, datetime(2030, 1, 15, 18, 0), timezone="America/New_York")
+    add_appointment(db_session, 2, datetime(2030, 1, 16, 9, 0), timezone="Asia/Seoul")
+
+    response = client.get("/appointments/export", params={"format": "csv"},
+                          headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["user_id"] for r in rows] == ["1", "2"]
+    assert rows[0]["start_time"] == "2030-01-15T13:00:00-05:00"
+    assert rows[1]["start_time"] == "2030-01-16T18:00:00+09:00"
+
+
+def test_export_ndjson_range_includes_archive(client, db_session):
+    now = datetime.utcnow()
+    archived_id = add_appointment(db_session, 1, now - timedelta(days=30))
+    add_appointment(db_session, 1, now - timedelta(days=60))
+    live_id = add_appointment(db_session, 1, now + timedelta(days=1))
+    archive_past_appointments(db_session, archive_cutoff(now, days=7))
+
+    response = client.get("/appointments/export", params={
+        "format": "ndjson",
+        "from": (now - timedelta(days=45)).isoformat(),
+        "to": (now + timedelta(days=2)).isoformat()
+    })
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["appointment_id"] for r in records] == [archived_id, live_id]
+
+
+def test_export_gzip_stream(db_session):
+    for i in range(25):
+        add_appointment(db_session, i, datetime(2030, 2, 1) + timedelta(hours=i))
+
+    chunks = list(stream_export(db_session, "csv", compress=True, batch_size=10))
+    assert len(chunks) > 1
+    lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+    assert lines[0] == "appointment_id,user_id,start_time,end_time,timezone"
+    assert len(lines) == 26
+
+
+def test_export_rejects_unknown_format(client):
+    response = client.get("/appointments/export", params={"format": "xml"})
+    assert response.status_code == 422
@@ -0,0 +1,168 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import StaticPool, create_engine, text
+
+from tdcs_dance_svc import health
+from tdcs_dance_svc.health import check_database, check_databases, migration_heads, migration_revisions
+
+
+def make_engine():
+    return create_engine('sqlite:///:memory:',
+                         connect_args={'check_same_thread': False},
+                         poolclass=StaticPool)
+
+
+def stamp(engine, revision):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        connection.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+
+@pytest.fixture
+def debug_headers(monkeypatch):
+    monkeypatch.setattr("tdcs_dance_svc.routers.health.DEBUG_ENDPOINTS", True)
+    monkeypatch.setattr("tdcs_dance_svc.routers.health.DEBUG_TOKEN", "s3cret")
+    return {"X-Debug-Token": "s3cret"}
+
+
+def test_healthz(client):
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_migration_heads_come_from_the_scripts():
+    assert migration_heads("alembic.ini")
+    assert migration_heads("/nonexistent/alembic.ini") == ()
+
+
+def test_check_database_compares_the_migration_head():
+    heads = migration_heads("alembic.ini")
+    engine = make_engine()
+
+    missing = check_database(engine, heads)
+    assert missing["ok"] is False
+    assert missing["latency_ms"] is not None
+
+    stamp(engine, "0001")
+    behind = check_database(engine, heads)
+    assert behind["ok"] is False
+    assert behind["revision"] == "0001"
+
+    current = make_engine()
+    stamp(current, heads[0])
+    assert check_database(current, heads)["ok"] is True
+    # Without deployed migration scripts only the ping counts
+    assert check_database(make_engine(), ())["ok"] is True
+
+
+def test_database_ahead_of_the_code_is_ready():
+    heads = migration_heads("alembic.ini")
+    known = migration_revisions("alembic.ini")
+    assert set(heads) <= known
+
+    behind = make_engine()
+    stamp(behind, "0001")
+    assert check_database(behind, heads, known)["ok"] is False
+
+    current = make_engine()
+    stamp(current, heads[0])
+    assert check_database(current, heads, known) | {"latency_ms": None} == {
+        "ok": True, "latency_ms": None, "revision": heads[0], "ahead": False, "error": None
+    }
+
+    # A revision this code does not know was written by newer code, e.g. mid-rollback
+    ahead = make_engine()
+    stamp(ahead, "ffffffffffff")
+    result = check_database(ahead, heads, known)
+    assert result["ok"] is True
+    assert result["ahead"] is True
+
+
+def test_readyz_reports_each_database(client, monkeypatch):
+    engine = make_engine()
+    stamp(engine, "0001")
+    monkeypatch.setattr(health, "database_engines", lambda: {"default": engine})
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "degraded"
+    assert response.json()["databases"]["default"]["revision"] == "0001"
+
+    monkeypatch.setattr(health, "migration_heads", lambda: ("0001",))
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_slow_database_check_times_out(monkeypatch):
+    calls = []
+
+    def stalled(*args):
+        calls.append(args)
+        time.sleep(0.3)
+        return {"ok": True}
+    monkeypatch.setattr(health, "check_database", stalled)
+    monkeypatch.setattr(health, "migration_heads", lambda: ())
+    monkeypatch.setattr(health, "database_engines", lambda engine=make_engine(): {"default": engine})
+
+    results = asyncio.run(check_databases(timeout=0.05))
+    assert results["default"]["ok"] is False
+    assert "0.05" in results["default"]["error"]
+
+    # A probe that is still running is waited on again rather than started twice
+    assert asyncio.run(check_databases(timeout=0.05))["default"]["ok"] is False
+    assert asyncio.run(check_databases(timeout=1))["default"]["ok"] is True
+    assert len(calls) == 1
+
+
+def test_database_check_bounds_its_statements(monkeypatch):
+    runaway = text("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n")
+    monkeypatch.setattr(health, "text", lambda sql: runaway)
+
+    started = time.monotonic()
+    result = check_database(make_engine(), (), timeout=0.05)
+
+    assert result["ok"] is False
+    assert time.monotonic() - started < 1
+
+
+def test_debug_runtime(client, debug_headers):
+    client.get("/appointments")
+    response = client.get("/debug/runtime", headers=debug_headers)
+
+    assert response.status_code == 200
+    runtime = response.json()
+    assert runtime["threads"]["count"] >= 1
+    assert runtime["event_loop_lag_ms"] >= 0
+    assert len(runtime["gc"]["counts"]) == 3
+    assert runtime["events"]["subscribers"] == 0
+    assert runtime["tracemalloc"] == {"tracing": False}
+    assert "limit" in runtime["concurrency"]
+
+
+def test_debug_runtime_tracemalloc_on_demand(client, debug_headers):
+    try:
+        started = client.get("/debug/runtime", params={"tracemalloc": "start"},
+                             headers=debug_headers).json()["tracemalloc"]
+        assert started["tracing"] is True
+        # Only allocations made after tracing started are listed, so ask in a later request
+        traced = client.get("/debug/runtime", params={"top": 5}, headers=debug_headers).json()["tracemalloc"]
+        assert 0 < len(traced["top"]) <= 5
+        assert {"location", "size_kb", "count"} <= set(traced["top"][0])
+    finally:
+        stopped = client.get("/debug/runtime", params={"tracemalloc": "stop"},
+                             headers=debug_headers).json()["tracemalloc"]
+    assert stopped == {"tracing": False}
+
+
+def test_debug_runtime_is_off_by_default(client):
+    assert client.get("/debug/runtime").status_code == 404
+
+
+def test_debug_runtime_requires_a_token_off_loopback(client, debug_headers):
+    assert client.get("/debug/runtime").status_code == 403
+    assert client.get("/debug/runtime", headers={"X-Debug-Token": "wrong"}).status_code == 403
+    assert client.get("/debug/runtime", headers=debug_headers).status_code == 200
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from tdcs_dance_svc import holds
+from tdcs_dance_svc.routers import appointment as appointment_router
+from tdcs_dance_svc.holds import expire_holds, run_hold_sweeper
+from tdcs_dance_svc.models.appointment import Appointment, AppointmentHold
+from tdcs_dance_svc.models.base import Base
+
+
+def slot(start, user_id=1, **extra):
+    return {
+        "user_id": user_id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        **extra
+    }
+
+
+def test_hold_blocks_other_bookings_and_holds(client):
+    start = datetime.utcnow() + timedelta(days=1)
+
+    response = client.post("/appointments/hold", json=slot(start))
+    assert response.status_code == 200
+    assert response.json()["hold_id"]
+
+    assert client.post("/appointments/hold", json=slot(start, user_id=2)).status_code == 409
+    assert client.post("/appointments/book", json=slot(start, user_id=2, timezone="UTC")).status_code == 409
+    availability = client.get("/appointments/availability", params={
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat()
+    })
+    assert availability.json()["available"] is False
+
+
+def test_booking_converts_the_hold(client, db_session):
+    start = datetime.utcnow() + timedelta(days=1)
+    hold_id = client.post("/appointments/hold", json=slot(start)).json()["hold_id"]
+
+    response = client.post("/appointments/book", json=slot(start, timezone="UTC", hold_id=hold_id))
+
+    assert response.status_code == 200
+    assert db_session.query(AppointmentHold).count() == 0
+    assert db_session.query(Appointment).count() == 1
+    # A hold can only be used once
+    again = client.post("/appointments/book", json=slot(start, timezone="UTC", hold_id=hold_id))
+    assert again.status_code == 409
+
+
+def test_hold_must_match_user_and_slot(client, db_session):
+    start = datetime.utcnow() + timedelta(days=1)
+    hold_id = client.post("/appointments/hold", json=slot(start)).json()["hold_id"]
+
+    other_user = client.post("/appointments/book", json=slot(start, user_id=2, timezone="UTC", hold_id=hold_id))
+    other_slot = client.post("/appointments/book",
+                             json=slot(start + timedelta(hours=3), timezone="UTC", hold_id=hold_id))
+
+    assert other_user.status_code == 409
+    assert other_slot.status_code == 409
+    # The failed attempts did not consume the hold
+    assert db_session.query(AppointmentHold).count() == 1
+
+
+def test_expired_hold_frees_the_slot(client, db_session):
+    start = datetime.utcnow() + timedelta(days=1)
+    hold_id = client.post("/appointments/hold", json=slot(start)).json()["hold_id"]
+    db_session.get(AppointmentHold, hold_id).expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+
+    assert client.post("/appointments/book", json=slot(start, timezone="UTC", hold_id=hold_id)).status_code == 409
+    assert client.post("/appointments/book", json=slot(start, user_id=2, timezone="UTC")).status_code == 200
+
+
+def test_hold_ttl_is_bounded(client):
+    start = datetime.utcnow() + timedelta(days=1)
+    assert client.post("/appointments/hold", json=slot(start, ttl_seconds=10**6)).status_code == 422
+    assert client.post("/appointments/hold", json=slot(start - timedelta(days=2))).status_code == 400
+
+
+def test_expire_holds_deletes_only_expired_rows(db_session):
+    now = datetime.now(timezone.utc)
+    start = now + timedelta(days=1)
+    for expires_in in (-60, -1, 60):
+        db_session.add(AppointmentHold(user_id=1, start_time=start, end_time=start + timedelta(hours=1),
+                                       expires_at=now + timedelta(seconds=expires_in)))
+    db_session.commit()
+
+    assert expire_holds(db_session, now) == 2
+    assert db_session.query(AppointmentHold).count() == 1
+
+
+def test_sweeper_runs_until_cancelled(monkeypatch):
+    sweeps = []
+    monkeypatch.setattr(holds, "sweep_expired_holds", lambda: sweeps.append(1) or {"default": 1})
+
+    async def run():
+        task = asyncio.create_task(run_hold_sweeper(interval=0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert len(sweeps) >= 2
+
+
+def test_concurrent_holds_for_one_slot_are_serialized(tmp_path, monkeypatch):
+    # A file database, so each thread has its own connection and transaction
+    engine = create_engine(f"sqlite:///{tmp_path / 'holds.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine)
+
+    real_slot_taken = appointment_router.slot_taken
+
+    def slow_slot_taken(*args):
+        taken = real_slot_taken(*args)
+        # Give the other request time to run its own check before this one inserts
+        time.sleep(0.2)
+        return taken
+
+    monkeypatch.setattr(appointment_router, "slot_taken", slow_slot_taken)
+
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    outcomes = []
+
+    def hold(user_id):
+        request = appointment_router.AppointmentHoldRequest(
+            user_id=user_id, start_time=start, end_time=start + timedelta(hours=1))
+        with session_local() as session:
+            try:
+                appointment_router.hold_appointment(request, db=session)
+                outcomes.append(200)
+            except HTTPException as e:
+                outcomes.append(e.status_code)
+
+    threads = [threading.Thread(target=hold, args=(user_id,)) for user_id in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes) == [200, 409]
+    with session_local() as session:
+        assert session.scalar(select(func.count()).select_from(AppointmentHold)) == 1
+    engine.dispose()
@@ -0,0 +1,149 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import StaticPool, create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from tdcs_dance_svc import loadshed
+from tdcs_dance_svc.loadshed import (
+    AdaptiveConcurrencyLimiter,
+    DeadlineExceeded,
+    _deadline,
+    concurrency_limiter,
+    is_overload_error,
+)
+from tdcs_dance_svc.profiling import QueryStats, _current_stats, query_profiler
+from tdcs_dance_svc.routers import appointment
+
+
+def booking(start):
+    return {
+        "user_id": 1,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    }
+
+
+def test_limit_backs_off_on_slow_responses_and_recovers():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, min_limit=2, max_limit=12, latency_target_ms=0)
+
+    for _ in range(30):
+        assert limiter.try_acquire()
+        limiter.release(latency=1.0)
+    assert limiter.limit == 2
+
+    for _ in range(200):
+        assert limiter.try_acquire()
+        limiter.release(latency=0.0)
+    # A zero target means nothing counts as fast except an instant response
+    assert limiter.limit == 12
+
+
+def test_one_burst_of_slow_responses_backs_off_once():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_target_ms=60000)
+    for _ in range(5):
+        limiter.try_acquire()
+    for _ in range(5):
+        limiter.release(latency=120.0)
+    assert limiter.limit == 9
+
+
+def test_bulk_imports_do_not_shrink_the_limit(client, monkeypatch):
+    # Every measured response counts as slow
+    monkeypatch.setattr(concurrency_limiter, "latency_target", 0)
+    limit = concurrency_limiter.limit
+    csv_text = "user_id,start_time,end_time,timezone\n1,2030-06-01T10:00:00,2030-06-01T11:00:00,UTC\n"
+
+    assert client.post("/appointments/import", content=csv_text).status_code == 200
+    assert concurrency_limiter.snapshot() == {"limit": limit, "in_flight": 0, "shed_total": 0}
+
+    client.get("/appointments")
+    assert concurrency_limiter.limit < limit
+
+
+def test_requests_over_the_limit_are_shed(client):
+    concurrency_limiter.in_flight = concurrency_limiter.limit
+
+    response = client.get("/appointments")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert concurrency_limiter.snapshot()["shed_total"] == 1
+
+    ready = client.get("/readyz")
+    assert ready.status_code == 503
+    assert ready.json()["status"] == "overloaded"
+
+    # Probes and metrics are not DB-bound requests and are never shed
+    assert "tdcs_requests_shed_total 1" in client.get("/metrics").text
+
+
+def test_ready_when_under_the_limit(client, monkeypatch):
+    # The in-memory test database has no migration history
+    monkeypatch.setattr("tdcs_dance_svc.health.migration_heads", lambda: ())
+    assert client.get("/appointments").status_code == 200
+    assert concurrency_limiter.in_flight == 0
+
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_database_timeout_during_booking_is_a_fast_503(client, monkeypatch):
+    def stalled(*args, **kwargs):
+        raise DeadlineExceeded("deadline passed")
+    monkeypatch.setattr(appointment, "slot_taken", stalled)
+
+    response = client.post("/appointments/book", json=booking(datetime.utcnow() + timedelta(days=1)))
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_statements_stop_at_the_request_deadline():
+    engine = create_engine('sqlite:///:memory:', poolclass=StaticPool)
+    runaway = text("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n")
+
+    token = _deadline.set(time.monotonic() + 0.05)
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError) as error:
+                connection.execute(runaway)
+            assert is_overload_error(error.value)
+
+        time.sleep(0.06)
+        with engine.connect() as connection:
+            with pytest.raises(DeadlineExceeded):
+                connection.execute(text("SELECT 1"))
+    finally:
+        _deadline.reset(token)
+
+    # Outside of a request the connection has no deadline
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar_one() == 1
+
+
+def test_deadline_is_sent_once_per_transaction(monkeypatch):
+    # Stand in for Postgres' SET LOCAL with a statement SQLite accepts
+    monkeypatch.setitem(loadshed.DEADLINE_STATEMENTS, "sqlite", "SELECT {ms}")
+    engine = create_engine('sqlite:///:memory:', poolclass=StaticPool)
+    stats = QueryStats()
+    query_profiler.enable()
+    stats_token = _current_stats.set(stats)
+    token = _deadline.set(time.monotonic() + 5)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+            connection.commit()
+            connection.execute(text("SELECT 3"))
+    finally:
+        _deadline.reset(token)
+        _current_stats.reset(stats_token)
+        query_profiler.disable()
+
+    deadline_statements = [s for s in stats.statements if s not in ("SELECT 1", "SELECT 2", "SELECT 3")]
+    assert sum(stats.statements[s] for s in deadline_statements) == 2
+    assert stats.count == 5
+
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import StaticPool, create_engine
+
+from tdcs_dance_svc.models.base import Base
+from tdcs_dance_svc.perf import PERF_ANCHOR, generate_appointments, load_appointments, plan_issues, run_harness
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_generator_is_deterministic():
+    first = list(generate_appointments(500, seed=7))
+    assert first == list(generate_appointments(500, seed=7))
+    assert first != list(generate_appointments(500, seed=8))
+
+
+def test_generator_mixes_history_and_future():
+    rows = list(generate_appointments(5000, lanes=10))
+    history = sum(1 for row in rows if row["end_time"] < PERF_ANCHOR)
+    assert 0.6 < history / len(rows) < 0.95
+    assert all(row["end_time"] > row["start_time"] for row in rows)
+
+
+def test_harness_reports_plans_for_hot_queries():
+    engine = create_engine('sqlite:///:memory:', poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    assert load_appointments(engine, generate_appointments(2000), batch_size=500) == 2000
+
+    results = run_harness(engine, repeat=1)
+    assert [r["name"] for r in results] == ["booking_conflict", "lookup", "listing_by_user", "listing_by_range"]
+    for result in results:
+        assert result["plan"]
+        assert result["issues"] == []
+
+
+def test_plan_issues_flags_scans_and_sorts():
+    assert plan_issues("sqlite", "SCAN appointments\nUSE TEMP B-TREE FOR ORDER BY") == [
+        "full table scan: SCAN appointments",
+        "sort not served by an index: USE TEMP B-TREE FOR ORDER BY",
+    ]
+    assert plan_issues("sqlite", "SCAN appointments USING COVERING INDEX ix_appointments_end_time") == []
+    assert plan_issues("postgresql", "Seq Scan on appointments  (cost=0.00..1.01 rows=1 width=4)")
+
+
+def test_perf_check_runs_migrations_to_head(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'perf.db'}"
+    env = {**os.environ, "PYTHONPATH": str(REPO_DIR / "src")}
+    result = subprocess.run(
+        [sys.executable, "-m", "tdcs_dance_svc.maintenance", "perf-check",
+         "--database-url", database_url, "--alembic-config", str(REPO_DIR / "alembic.ini"), "--rows", "2000"],
+        capture_output=True, text=True, env=env, cwd=tmp_path
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "== booking_conflict" in result.stdout
@@ -0,0 +1,56 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from tdcs_dance_svc.profiling import QueryStats, _current_stats, query_profiler
+
+
+@pytest.fixture
+def profiler():
+    query_profiler.enable()
+    yield query_profiler
+    query_profiler.disable()
+
+
+def test_headers_absent_when_disabled(client):
+    response = client.get("/appointments")
+    assert response.status_code == 200
+    assert "x-db-statements" not in response.headers
+
+
+def test_request_stats_in_headers(client, profiler):
+    response = client.get("/appointments")
+    assert response.status_code == 200
+    # The schedule version lookup and the listing query
+    assert response.headers["x-db-statements"] == "2"
+    assert float(response.headers["x-db-time-ms"]) >= 0
+    assert response.headers["x-db-repeated-statements"] == "0"
+
+
+def test_repeated_statements_are_counted(db_session, profiler):
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        for _ in range(3):
+            db_session.execute(text("SELECT 1")).all()
+    finally:
+        _current_stats.reset(token)
+    assert stats.count == 3
+    assert stats.repeated() == {"SELECT 1": 3}
+
+
+def test_slow_statement_is_logged_with_plan(db_session, profiler, monkeypatch, caplog):
+    monkeypatch.setattr(profiler, "slow_query_ms", 0)
+    caplog.set_level(logging.WARNING)
+    db_session.execute(text("SELECT id FROM appointments WHERE user_id = 1")).all()
+    assert "Slow query" in caplog.text
+    assert "ix_appointments_user_id" in caplog.text
+
+
+def test_failed_statement_does_not_leak_a_start_time(db_session, profiler):
+    with pytest.raises(OperationalError):
+        db_session.execute(text("SELECT * FROM no_such_table"))
+    db_session.rollback()
+    assert not db_session.connection().info.get("query_start_time")
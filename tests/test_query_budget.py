@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from tdcs_dance_svc import loadshed
+from tdcs_dance_svc.profiling import query_profiler
+
+# Maximum SQL statements per request. Lower these when a change saves a round trip;
+# a change that needs to raise one should say why. On Postgres every transaction of a
+# request also sends one SET LOCAL statement_timeout, counted by DEADLINE_STATEMENT_COST.
+STATEMENT_BUDGETS = {
+    # writes bump the shared schedule version in their transaction
+    "book": 3,
+    "hold": 3,
+    # claiming the hold is one DELETE on top of a plain booking
+    "book_with_hold": 4,
+    # schedule reads look up the schedule version for their ETag first
+    "lookup": 2,
+    "listing": 2,
+    "availability": 2,
+}
+DEADLINE_STATEMENT_COST = 1
+
+
+@pytest.fixture
+def profiled_client(client):
+    query_profiler.enable()
+    yield client
+    query_profiler.disable()
+
+
+def statements(response):
+    assert response.status_code == 200
+    return int(response.headers["x-db-statements"])
+
+
+def test_statement_budgets(profiled_client):
+    start = datetime.utcnow() + timedelta(days=1)
+    booking = profiled_client.post("/appointments/book", json={
+        "user_id": 1,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    })
+    assert statements(booking) <= STATEMENT_BUDGETS["book"]
+
+    appointment_id = booking.json()["appointment_id"]
+    assert statements(profiled_client.get(f"/appointments/{appointment_id}")) <= STATEMENT_BUDGETS["lookup"]
+    assert statements(profiled_client.get("/appointments", params={"user_id": 1})) <= STATEMENT_BUDGETS["listing"]
+    availability = profiled_client.get("/appointments/availability", params={
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat()
+    })
+    assert statements(availability) <= STATEMENT_BUDGETS["availability"]
+
+
+def test_hold_statement_budgets(profiled_client):
+    start = datetime.utcnow() + timedelta(days=1)
+    slot = {
+        "user_id": 1,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat()
+    }
+    hold = profiled_client.post("/appointments/hold", json=slot)
+    assert statements(hold) <= STATEMENT_BUDGETS["hold"]
+
+    booking = profiled_client.post("/appointments/book", json={
+        **slot, "timezone": "UTC", "hold_id": hold.json()["hold_id"]
+    })
+    assert statements(booking) <= STATEMENT_BUDGETS["book_with_hold"]
+
+
+def test_request_deadline_costs_one_statement_per_transaction(profiled_client, monkeypatch):
+    # Stand in for Postgres' SET LOCAL with a statement SQLite accepts
+    monkeypatch.setitem(loadshed.DEADLINE_STATEMENTS, "sqlite", "SELECT {ms}")
+    start = datetime.utcnow() + timedelta(days=1)
+    booking = profiled_client.post("/appointments/book", json={
+        "user_id": 1,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    })
+    assert statements(booking) <= STATEMENT_BUDGETS["book"] + DEADLINE_STATEMENT_COST
+
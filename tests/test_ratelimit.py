@@ -0,0 +1,128 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from starlette.authentication import SimpleUser
+
+from tdcs_dance_svc.ratelimit import (
+    RateLimit,
+    RateLimiter,
+    RateLimitMiddleware,
+    ShardedBucketStore,
+    parse_rate_limits,
+    rate_limiter,
+)
+
+
+def test_parse_rate_limits_skips_malformed_entries():
+    limits = parse_rate_limits("post /appointments/book=5/10; garbage ;GET /auth/google/callback=2/1")
+    assert set(limits) == {("POST", "/appointments/book"), ("GET", "/auth/google/callback")}
+    assert limits[("POST", "/appointments/book")].refill_rate == 0.5
+
+
+def test_token_bucket_refills_over_time():
+    store = ShardedBucketStore(shards=4)
+    limit = RateLimit(2, 10)
+    assert store.take("k", limit, now=0)[0] is True
+    assert store.take("k", limit, now=0)[0] is True
+    allowed, retry_after = store.take("k", limit, now=0)
+    assert allowed is False
+    assert retry_after == pytest.approx(5)
+    assert store.take("k", limit, now=5)[0] is True
+
+
+def test_user_and_ip_buckets_are_independent():
+    limiter = RateLimiter({("POST", "/x"): RateLimit(1, 60)})
+    assert limiter.check("POST", "/x", "1.1.1.1", "7") is None
+    # Same user from another IP is still limited by the user bucket
+    assert limiter.check("POST", "/x", "2.2.2.2", "7") is not None
+    # Unlimited routes are always admitted
+    assert limiter.check("GET", "/x", "1.1.1.1", "7") is None
+    assert limiter.snapshot()[("POST /x", "user", "rejected")] == 1
+
+
+def test_rejected_request_spends_no_tokens():
+    limiter = RateLimiter({("POST", "/x"): RateLimit(1, 60)})
+    assert limiter.check("POST", "/x", "1.1.1.1", "7") is None
+    # The user bucket rejects, so the fresh IP bucket of 2.2.2.2 keeps its token
+    assert limiter.check("POST", "/x", "2.2.2.2", "7") is not None
+    assert limiter.check("POST", "/x", "2.2.2.2", "8") is None
+
+
+def test_pruning_refills_each_bucket_with_its_own_limit():
+    store = ShardedBucketStore(shards=1, max_keys_per_shard=1)
+    slow = RateLimit(1, 100)
+    assert store.take("slow", slow, now=0)[0] is True
+    # Pruning under a fast limit must not treat the slow bucket as refilled
+    assert store.take("fast", RateLimit(1, 1), now=10)[0] is True
+    allowed, retry_after = store.take("slow", slow, now=10)
+    assert allowed is False
+    assert retry_after == pytest.approx(90)
+
+
+def test_unauthenticated_callers_are_limited_by_ip_alone(client, monkeypatch):
+    monkeypatch.setitem(rate_limiter.limits, ("POST", "/appointments/book"), RateLimit(1, 60))
+    start = datetime.utcnow() + timedelta(days=1)
+    body = {
+        "user_id": 5,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    }
+    assert client.post("/appointments/book", json=body, headers={"X-User-Id": "1"}).status_code == 200
+    assert client.post("/appointments/book", json=body, headers={"X-User-Id": "2"}).status_code == 429
+
+    metrics = rate_limiter.snapshot()
+    assert metrics[("POST /appointments/book", "ip", "rejected")] == 1
+    # The body's user_id did not spend user 5's tokens, so nobody can lock user 5 out
+    assert rate_limiter.check("POST", "/appointments/book", "10.0.0.1", "5") is None
+
+
+def test_authenticated_users_get_their_own_bucket():
+    limiter = RateLimiter({("POST", "/x"): RateLimit(1, 60)})
+    statuses = []
+
+    async def app(scope, receive, send):
+        statuses.append(200)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    middleware = RateLimitMiddleware(app, limiter)
+    for ip in ("1.1.1.1", "2.2.2.2"):
+        scope = {"type": "http", "method": "POST", "path": "/x", "headers": [],
+                 "client": (ip, 1234), "user": SimpleUser("alice")}
+        asyncio.run(middleware(scope, None, send))
+
+    assert statuses == [200, 429]
+    assert limiter.snapshot()[("POST /x", "user", "rejected")] == 1
+
+
+def test_booking_is_rate_limited(client, monkeypatch):
+    monkeypatch.setitem(rate_limiter.limits, ("POST", "/appointments/book"), RateLimit(2, 60))
+    start = datetime.utcnow() + timedelta(days=1)
+    statuses = []
+    for i in range(3):
+        slot = start + timedelta(hours=2 * i)
+        response = client.post("/appointments/book", json={
+            "user_id": 1,
+            "start_time": slot.isoformat(),
+            "end_time": (slot + timedelta(hours=1)).isoformat(),
+            "timezone": "UTC"
+        })
+        statuses.append(response.status_code)
+
+    assert statuses == [200, 200, 429]
+    assert int(response.headers["retry-after"]) >= 1
+
+    metrics = client.get("/metrics").text
+    assert 'route="POST /appointments/book",key="ip",outcome="rejected"} 1' in metrics
+
+
+def test_oauth_callback_is_rate_limited(client, monkeypatch):
+    monkeypatch.setitem(rate_limiter.limits, ("GET", "/auth/google/callback"), RateLimit(1, 60))
+    first = client.get("/auth/google/callback")
+    second = client.get("/auth/google/callback")
+    assert first.status_code == 400
+    assert second.status_code == 429
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import StaticPool, create_engine, text
+
+from tdcs_dance_svc.models import base
+from tdcs_dance_svc.models.base import Base, PRIMARY_STICKY_COOKIE, ReplicaRouter, ReplicaSession
+
+
+def make_engine():
+    engine = create_engine('sqlite:///:memory:',
+                           connect_args={'check_same_thread': False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def test_round_robin_across_replicas():
+    first, second = make_engine(), make_engine()
+    router = ReplicaRouter([first, second])
+    assert [router.pick() for _ in range(4)] == [first, second, first, second]
+
+
+def test_unhealthy_replica_is_skipped_until_it_answers_a_ping(monkeypatch):
+    healthy = make_engine()
+    broken = create_engine('sqlite:////nonexistent-dir/replica.db')
+    router = ReplicaRouter([broken, healthy], retry_seconds=0)
+
+    router.mark_down(broken)
+    # The broken replica fails its ping and stays out of rotation
+    assert [router.pick() for _ in range(3)] == [healthy, healthy, healthy]
+
+    router = ReplicaRouter([healthy], retry_seconds=0)
+    router.mark_down(healthy)
+    assert router.pick() is healthy
+
+
+def test_no_healthy_replica_returns_none():
+    router = ReplicaRouter([make_engine()], retry_seconds=60)
+    router.mark_down(router.engines[0])
+    assert router.pick() is None
+
+
+def test_reads_use_replica_and_writes_stick_to_primary(client, monkeypatch):
+    # An empty replica that has not caught up with the primary
+    replica_router = ReplicaRouter([make_engine()])
+    monkeypatch.setattr(base, "get_replica_router", lambda: replica_router)
+
+    start = datetime.utcnow() + timedelta(minutes=20)
+    payload = {
+        "user_id": 1,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    }
+    response = client.post("/appointments/book", json=payload)
+    assert response.status_code == 200
+    assert PRIMARY_STICKY_COOKIE in response.cookies
+    appointment_id = response.json()["appointment_id"]
+
+    # Within the sticky window the caller reads its own write from the primary
+    sticky = client.get(f"/appointments/{appointment_id}",
+                        cookies={PRIMARY_STICKY_COOKIE: response.cookies[PRIMARY_STICKY_COOKIE]})
+    assert sticky.status_code == 200
+
+    # Other callers are served by the replica
+    client.cookies.clear()
+    assert client.get(f"/appointments/{appointment_id}").status_code == 404
+
+
+def test_dead_replica_is_marked_down_and_reads_fall_back_to_primary(client, monkeypatch):
+    dead = create_engine('sqlite:////nonexistent-dir/replica.db')
+    replica_router = ReplicaRouter([dead], retry_seconds=60)
+    monkeypatch.setattr(base, "get_replica_router", lambda: replica_router)
+
+    start = datetime.utcnow() + timedelta(minutes=20)
+    response = client.post("/appointments/book", json={
+        "user_id": 1,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    })
+    appointment_id = response.json()["appointment_id"]
+    client.cookies.clear()
+
+    lookup = client.get(f"/appointments/{appointment_id}")
+    assert lookup.status_code == 200
+    assert replica_router._down_until[id(dead)] > 0
+    assert replica_router.pick() is None
+
+    # With the replica out of rotation, reads go straight to the primary
+    listing = client.get("/appointments")
+    assert [a["appointment_id"] for a in listing.json()] == [appointment_id]
+
+    # A fresh dead replica is also taken out by availability checks, which read with scalar
+    replica_router = ReplicaRouter([dead], retry_seconds=60)
+    monkeypatch.setattr(base, "get_replica_router", lambda: replica_router)
+    availability = client.get("/appointments/availability", params={
+        "start_time": start.isoformat() + "+00:00",
+        "end_time": (start + timedelta(hours=1)).isoformat() + "+00:00"
+    })
+    assert availability.status_code == 200
+    assert availability.json()["available"] is False
+    assert replica_router.pick() is None
+
+
+def test_replica_session_fails_over_for_every_read_method():
+    primary = make_engine()
+    dead = create_engine('sqlite:////nonexistent-dir/replica.db')
+    for read in (lambda s: s.scalar(text("SELECT 1")), lambda s: s.scalars(text("SELECT 1")).one()):
+        replica_router = ReplicaRouter([dead], retry_seconds=60)
+        with ReplicaSession(dead, replica_router, primary=primary) as session:
+            assert read(session) == 1
+            assert session.get_bind() is primary
+        assert replica_router.pick() is None
+
@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.orm import Session
+
+from tdcs_dance_svc.events import broker
+from tdcs_dance_svc.models import base
+from tdcs_dance_svc.models.appointment import Appointment
+from tdcs_dance_svc.models.base import Base, DEFAULT_LOCATION, ShardMap, scatter_gather, session_for
+
+
+def make_engine():
+    engine = create_engine('sqlite:///:memory:',
+                           connect_args={'check_same_thread': False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def shard_map(monkeypatch):
+    shards = ShardMap({"downtown": make_engine(), "uptown": make_engine()})
+    monkeypatch.setattr(base, "get_shard_map", lambda: shards)
+    return shards
+
+
+def booking(start, user_id=1):
+    return {
+        "user_id": user_id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "timezone": "UTC"
+    }
+
+
+def count_appointments(engine):
+    with Session(bind=engine) as session:
+        return session.query(Appointment).count()
+
+
+def test_booking_goes_to_the_location_shard(client, shard_map):
+    start = datetime.utcnow() + timedelta(days=1)
+
+    response = client.post("/appointments/book", json=booking(start), headers={"X-Location": "downtown"})
+    assert response.status_code == 200
+
+    assert count_appointments(shard_map.engine_for("downtown")) == 1
+    assert count_appointments(shard_map.engine_for("uptown")) == 0
+
+
+def test_conflicts_are_checked_within_one_shard(client, shard_map):
+    start = datetime.utcnow() + timedelta(days=1)
+
+    assert client.post("/appointments/book?location=downtown", json=booking(start)).status_code == 200
+    assert client.post("/appointments/book?location=uptown", json=booking(start)).status_code == 200
+    assert client.post("/appointments/book?location=uptown", json=booking(start)).status_code == 409
+
+
+def test_listing_reads_only_the_location_shard(client, shard_map):
+    start = datetime.utcnow() + timedelta(days=1)
+    client.post("/appointments/book", json=booking(start, user_id=7), headers={"X-Location": "uptown"})
+
+    uptown = client.get("/appointments", headers={"X-Location": "uptown"}).json()
+    downtown = client.get("/appointments", headers={"X-Location": "downtown"}).json()
+
+    assert [a["user_id"] for a in uptown] == [7]
+    assert downtown == []
+
+
+def test_location_is_required_and_must_be_known(client, shard_map):
+    start = datetime.utcnow() + timedelta(days=1)
+
+    assert client.post("/appointments/book", json=booking(start)).status_code == 400
+    assert client.get("/appointments", headers={"X-Location": "midtown"}).status_code == 404
+
+
+def test_location_is_ignored_without_shards(client):
+    start = datetime.utcnow() + timedelta(days=1)
+
+    response = client.post("/appointments/book", json=booking(start), headers={"X-Location": "anywhere"})
+    assert response.status_code == 200
+
+
+def test_report_gathers_every_shard(client, shard_map):
+    start = datetime.utcnow() + timedelta(days=1)
+    client.post("/appointments/book?location=downtown", json=booking(start, user_id=1))
+    client.post("/appointments/book?location=downtown", json=booking(start + timedelta(hours=2), user_id=1))
+    client.post("/appointments/book?location=uptown", json=booking(start, user_id=2))
+
+    response = client.get("/appointments/report")
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["appointments"] == 3
+    by_location = {entry["location"]: entry for entry in report["locations"]}
+    assert by_location["downtown"]["appointments"] == 2
+    assert by_location["downtown"]["users"] == 1
+    assert by_location["uptown"]["appointments"] == 1
+
+
+def test_report_without_shards_uses_the_primary(client):
+    start = datetime.utcnow() + timedelta(days=1)
+    client.post("/appointments/book", json=booking(start))
+
+    report = client.get("/appointments/report").json()
+
+    assert report["appointments"] == 1
+    assert [entry["location"] for entry in report["locations"]] == [DEFAULT_LOCATION]
+
+
+def test_scatter_gather_runs_on_each_shard(shard_map):
+    results = scatter_gather(lambda session: session.get_bind(), None)
+    assert results == {"downtown": shard_map.engine_for("downtown"), "uptown": shard_map.engine_for("uptown")}
+
+
+def test_session_for_rejects_unknown_locations(shard_map):
+    with pytest.raises(ValueError):
+        session_for("midtown")
+    with session_for("uptown") as session:
+        assert session.get_bind() is shard_map.engine_for("uptown")
+
+
+def test_events_carry_the_shard_location(client, shard_map):
+    async def scenario():
+        subscription = broker.subscribe(location="downtown")
+        try:
+            start = datetime.utcnow() + timedelta(days=1)
+            await asyncio.to_thread(client.post, "/appointments/book?location=uptown", json=booking(start))
+            response = await asyncio.to_thread(client.post, "/appointments/book?location=downtown", json=booking(start))
+            event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+            assert event["appointment_id"] == response.json()["appointment_id"]
+            assert event["location"] == "downtown"
+            assert subscription.queue.empty()
+        finally:
+            broker.unsubscribe(subscription)
+
+    asyncio.run(scenario())
+
+
+def test_stream_rejects_unknown_locations(client, shard_map):
+    assert client.get("/appointments/stream", params={"location": "midtown"}).status_code == 404
+
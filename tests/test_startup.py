@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Self time spent in this package's own modules when importing the app. Third-party
+# imports (FastAPI, SQLAlchemy, Pydantic) are excluded so the budget is not dominated
+# by the machine running the tests.
+OWN_IMPORT_BUDGET_MS = 250
+
+# Modules that must only be loaded on first use. The SQLite dialect is not listed: the
+# ``sqlite_autoincrement`` option on the appointments table is validated against it at import.
+LAZY_MODULES = ("requests", "dotenv", "alembic")
+
+
+def import_times():
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR), "ENV_FILE": "/nonexistent/.env"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import tdcs_dance_svc.app"],
+        capture_output=True, text=True, env=env, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def test_app_import_stays_lazy():
+    times = import_times()
+    assert "tdcs_dance_svc.app" in times
+    for module in LAZY_MODULES:
+        assert module not in times, f"{module} is imported when the app is imported"
+
+
+def test_app_import_time_budget():
+    times = import_times()
+    own_ms = sum(us for name, us in times.items() if name.startswith("tdcs_dance_svc")) / 1000
+    assert own_ms < OWN_IMPORT_BUDGET_MS
@@ -0,0 +1,90 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from tdcs_dance_svc import templating
+from tdcs_dance_svc.templating import TemplateCache, render_reminder, render_reminders
+
+UTC = timezone.utc
+
+
+class FakeAppointment:
+    def __init__(self, id, start_time, end_time, timezone="UTC", user_id=1):
+        self.id = id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.timezone = timezone
+        self.user_id = user_id
+
+
+def test_reminder_renders_in_appointment_timezone():
+    appointment = FakeAppointment(5, datetime(2030, 1, 15, 18, 0, tzinfo=UTC),
+                                  datetime(2030, 1, 15, 19, 0, tzinfo=UTC),
+                                  timezone="America/New_York")
+    email = render_reminder(appointment)
+    assert "2030-01-15 01:00 PM America/New_York" in email.text
+    assert email.subject == "Reminder: your appointment on 2030-01-15 01:00 PM America/New_York"
+    assert "<strong>2030-01-15 01:00 PM America/New_York</strong>" in email.html
+
+
+def test_locale_falls_back_to_language_then_default():
+    appointment = FakeAppointment(6, datetime(2030, 1, 15, 18, 0, tzinfo=UTC),
+                                  datetime(2030, 1, 15, 19, 0, tzinfo=UTC),
+                                  timezone="Europe/Madrid")
+    spanish = render_reminder(appointment, locale="es-MX")
+    assert spanish.text.startswith("Recordatorio")
+    assert "15/01/2030 19:00 Europe/Madrid" in spanish.text
+
+    unknown = render_reminder(appointment, locale="fr")
+    assert unknown.text.startswith("Reminder")
+
+
+def test_batch_rendering_uses_each_appointments_locale():
+    appointments = [
+        FakeAppointment(i, datetime(2030, 2, 1, 9 + i, 0, tzinfo=UTC), datetime(2030, 2, 1, 10 + i, 0, tzinfo=UTC),
+                        timezone="Asia/Seoul")
+        for i in range(3)
+    ]
+    locales = ["ko", "es-MX", "ko"]
+    assert render_reminders(zip(appointments, locales)) == [
+        render_reminder(appointment, locale=locale) for appointment, locale in zip(appointments, locales)
+    ]
+
+
+def test_html_values_are_escaped(tmp_path, monkeypatch):
+    (tmp_path / "en").mkdir()
+    (tmp_path / "en" / "note.txt").write_text("Hi $user_id")
+    (tmp_path / "en" / "note.html").write_text("<p>Hi $user_id</p>")
+    monkeypatch.setattr(templating, "template_cache", TemplateCache(str(tmp_path)))
+
+    email = templating.render("note", {"user_id": "<b>x</b>"})
+    assert email.text == "Hi <b>x</b>"
+    assert email.html == "<p>Hi &lt;b&gt;x&lt;/b&gt;</p>"
+    assert email.subject == ""
+
+
+def test_changed_template_is_reloaded(tmp_path):
+    (tmp_path / "en").mkdir()
+    path = tmp_path / "en" / "note.txt"
+    path.write_text("first")
+    cache = TemplateCache(str(tmp_path), reload_seconds=1e-9)
+    assert cache.get("note", "txt").template == "first"
+
+    path.write_text("second")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert cache.get("note", "txt").template == "second"
+
+
+def test_templates_are_cached_without_reload(tmp_path):
+    (tmp_path / "en").mkdir()
+    path = tmp_path / "en" / "note.txt"
+    path.write_text("first")
+    cache = TemplateCache(str(tmp_path), reload_seconds=0)
+    first = cache.get("note", "txt")
+
+    path.write_text("second")
+    assert cache.get("note", "txt") is first
+    cache.clear()
+    assert cache.get("note", "txt").template == "second"